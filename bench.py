@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""대시보드 처리 단계 벤치마크 (오프라인 실행).
+
+합성 워크북(입출고 base + 브랜드별 온라인 등록 시트)을 스타일 수별로 만들고, 한 번의 첫 화면 로드와 같은 순서로
+get_all_sources(로컬 가짜 Google 백엔드) → load_base_inout → build_style_table_all → build_inout_aggregates → load_brand_register_avg_days
+→ build_monitor_table (pipeline 모듈) → html(앞 단계 결과로 모니터링/입출고 표 HTML 만 생성, table_html 모듈)
+각 단계의 소요시간(wall)과 최대 메모리(tracemalloc peak)를 잰다.
+단계마다 이전 단계가 채운 캐시는 그대로 쓰고, 스타일 수가 바뀔 때마다 계산 캐시와 스냅샷 디렉터리를 비운다.
+
+    python bench.py                                   # 1k, 10k, 100k 스타일
+    python bench.py --sizes 1000 10000 --json bench.json
+    python bench.py --compare bench.json              # 이전 결과 대비 회귀 확인 (허용 범위 초과 시 종료 코드 1)
+"""
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import tracemalloc
+from io import BytesIO
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+STAGES = ["get_all_sources", "load_base_inout", "build_style_table_all", "build_inout_aggregates", "load_brand_register_avg_days", "build_monitor_table", "html"]
+
+BRAND_PREFIX = {"sp": "스파오", "rm": "로엠", "mi": "미쏘", "wh": "후아유", "hp": "슈펜", "cv": "클라비스", "eb": "에블린", "nb": "뉴발란스", "nk": "뉴발란스키즈"}
+RAW_SEASONS = ["1", "2", "A", "S", "F", "G1", "G2", "GA", "GS", 1, 2, "1 ", "2시즌", "FW"]
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+
+# ---- 합성 워크북 ----
+def _mixed_date(rng, day, kind):
+    """같은 날짜를 엑셀 일련번호(정수/실수)·문자열·datetime 중 하나로 표현."""
+    if kind == 0:
+        return int(day)
+    if kind == 1:
+        return float(day) + 0.375
+    d = EXCEL_EPOCH + timedelta(days=int(day))
+    return d.strftime("%Y-%m-%d") if kind == 2 else d
+
+
+def _write_xlsx(sheets):
+    """{시트명: 행 리스트} → xlsx 바이트 (openpyxl write_only)."""
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    for name, rows in sheets.items():
+        ws = wb.create_sheet(title=name)
+        for row in rows:
+            ws.append(row)
+    bio = BytesIO()
+    wb.save(bio)
+    return bio.getvalue()
+
+
+def make_workbooks(n_styles, register_sheets, seed=0):
+    """스타일 n_styles 개짜리 (입출고 base 바이트, 온라인 등록 바이트) 생성.
+
+    base: "물류입고스타일수" 시트, 제목/기준일 행 아래 헤더. 스타일당 1~3행, 최초입고일은 일련번호/문자열/날짜 혼합.
+    온라인: 브랜드별 시트, 잡다한 상단 행 아래 스타일코드/시즌/포토인계일/리터칭완료일/공홈등록일 헤더.
+    """
+    rng = np.random.default_rng(seed)
+    prefixes = np.array(list(BRAND_PREFIX))
+    style_prefix = prefixes[rng.integers(0, len(prefixes), n_styles)]
+    styles = [f"{p.upper()}{chr(65 + i % 26)}{i:07d}" for i, p in enumerate(style_prefix)]
+    first_in = 45600 + rng.integers(0, 365, n_styles)
+
+    header = ["스타일코드", "시즌", "최초입고일", "입고량", "누적입고액", "출고액", "누적 판매액[외형매출]", "발주 STY", "발주액"]
+    base_rows = [["입출고 현황 리포트"], ["기준일", datetime(2026, 1, 31)], [], header]
+    reps = rng.choice([1, 1, 2, 3], n_styles)
+    for i in np.repeat(np.arange(n_styles), reps):
+        received = rng.random() < 0.8
+        fi = _mixed_date(rng, first_in[i], int(rng.integers(0, 4))) if received and rng.random() < 0.9 else None
+        in_qty = int(rng.integers(10, 500)) if received else 0
+        in_amt = in_qty * int(rng.integers(1, 9)) * 10_000
+        out_amt = int(in_amt * rng.random()) if received and rng.random() < 0.7 else 0
+        sale_amt = int(out_amt * rng.random()) if out_amt and rng.random() < 0.8 else None
+        base_rows.append([styles[i], RAW_SEASONS[int(rng.integers(0, len(RAW_SEASONS)))], fi, in_qty, in_amt, out_amt, sale_amt, 1, int(rng.integers(1, 50)) * 1_000_000])
+    base_bytes = _write_xlsx({"물류입고스타일수": base_rows, "_meta": [["생성", "bench.py"]]})
+
+    by_brand = {}
+    for i, p in enumerate(style_prefix):
+        by_brand.setdefault(BRAND_PREFIX[p], []).append(i)
+    online = {}
+    for sheet_name in register_sheets:
+        rows = [[f"{sheet_name} 상품등록 트래킹판"], [], ["작성", "온라인팀", None, "※ 가등록 제외"], ["No", "스타일코드", "시즌", "포토인계일", "리터칭완료일", "공홈등록일", "비고"]]
+        for k, i in enumerate(by_brand.get(sheet_name, [])):
+            if rng.random() < 0.15:
+                continue
+            handover = first_in[i] + int(rng.integers(0, 12))
+            retouch = handover + int(rng.integers(0, 8))
+            register = retouch + int(rng.integers(0, 6))
+            kinds = rng.integers(0, 4, 3)
+            rows.append([
+                k + 1, styles[i], RAW_SEASONS[int(rng.integers(0, len(RAW_SEASONS)))],
+                _mixed_date(rng, handover, kinds[0]) if rng.random() < 0.9 else None,
+                _mixed_date(rng, retouch, kinds[1]) if rng.random() < 0.8 else None,
+                _mixed_date(rng, register, kinds[2]) if rng.random() < 0.7 else None,
+                None,
+            ])
+        online[sheet_name] = rows
+    return base_bytes, _write_xlsx(online)
+
+
+def cached_workbooks(n_styles, register_sheets, seed, workdir):
+    """workdir 에 같은 (스타일 수, seed) 워크북이 있으면 재사용."""
+    os.makedirs(workdir, exist_ok=True)
+    paths = [os.path.join(workdir, f"bench-{n_styles}-{seed}-{kind}.xlsx") for kind in ("base", "online")]
+    if all(os.path.exists(p) for p in paths):
+        return tuple(open(p, "rb").read() for p in paths)
+    data = make_workbooks(n_styles, register_sheets, seed=seed)
+    for p, b in zip(paths, data):
+        with open(p, "wb") as f:
+            f.write(b)
+    return data
+
+
+# ---- 측정 ----
+def _measure(fn):
+    tracemalloc.reset_peak()
+    t0 = time.perf_counter()
+    fn()
+    return {"seconds": round(time.perf_counter() - t0, 4), "peak_mb": round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)}
+
+
+def run_size(n_styles, seed, workdir, fetch_latency=0.0, fallback=False):
+    import pipeline as pl
+    from fake_sources import FakeSheetsBackend
+    from table_html import monitor_rows_html, monitor_table_document, TABLE_COLS, inout_table_html
+    base_bytes, online_bytes = cached_workbooks(n_styles, list(pl.BRAND_KEY_TO_SHEET_NAME.values()), seed, workdir)
+    backend = FakeSheetsBackend({"inout": base_bytes, "online": online_bytes}, latency={"export": fetch_latency, "values": fetch_latency})
+    if fallback:
+        backend.fail("export")  # xlsx export 대신 values.batchGet 폴백 경로 측정
+    pl.set_source_backend(backend)
+    pl.clear_caches()
+    shutil.rmtree(pl.SNAPSHOT_DIR, ignore_errors=True)
+
+    sources, frames = {}, {}
+    all_seasons = tuple(pl.SEASON_OPTIONS)
+
+    def html():
+        # 대시보드 첫 화면과 같은 두 표 (시즌 전체). 계산은 앞 단계에서 끝났으므로 여기서는 HTML 생성만 잰다
+        monitor_table_document(monitor_rows_html(frames["monitor"]))
+        inout_rows, _, brand_season_df = frames["inout"]
+        inout_table_html(pd.DataFrame(inout_rows, columns=["브랜드"] + TABLE_COLS), brand_season_df)
+
+    steps = {
+        "get_all_sources": lambda: sources.update(pl.get_all_sources()),
+        "load_base_inout": lambda: pl.load_base_inout(sources["inout"][0], _cache_key="inout_물류", target_sheet_name="물류입고스타일수"),
+        "build_style_table_all": lambda: pl.build_style_table_all(sources),
+        "build_inout_aggregates": lambda: frames.update(inout=pl.build_inout_aggregates(sources["inout"][0])),
+        "load_brand_register_avg_days": lambda: [pl.brand_lead_times(sources, b, all_seasons) for b in pl.BRAND_TO_KEY],
+        "build_monitor_table": lambda: frames.update(monitor=pl.build_monitor_table(sources, list(all_seasons))),
+        "html": html,
+    }
+    return {"styles": n_styles, "stages": {name: _measure(steps[name]) for name in STAGES}}
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)  # Linux: KB
+    except Exception:
+        return None
+
+
+def format_results(results):
+    lines = [f"{'styles':>8}  {'stage':<30}{'seconds':>10}{'peak MB':>10}"]
+    for r in results:
+        for name, m in r["stages"].items():
+            lines.append(f"{r['styles']:>8}  {name:<30}{m['seconds']:>10.3f}{m['peak_mb']:>10.1f}")
+        lines.append(f"{r['styles']:>8}  {'total':<30}{sum(m['seconds'] for m in r['stages'].values()):>10.3f}")
+    return "\n".join(lines)
+
+
+def compare_results(results, baseline, tolerance, min_seconds=0.05):
+    """기준 결과 대비 (소요시간 또는 peak 메모리가 tolerance 비율 넘게 늘어난) 회귀 목록."""
+    prev = {r["styles"]: r["stages"] for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        for name, m in r["stages"].items():
+            old = prev.get(r["styles"], {}).get(name)
+            if not old:
+                continue
+            if m["seconds"] > old["seconds"] * (1 + tolerance) and m["seconds"] - old["seconds"] > min_seconds:
+                regressions.append(f"{r['styles']} {name}: {old['seconds']:.3f}s → {m['seconds']:.3f}s")
+            if m["peak_mb"] > old["peak_mb"] * (1 + tolerance) and m["peak_mb"] - old["peak_mb"] > 1:
+                regressions.append(f"{r['styles']} {name}: {old['peak_mb']:.1f}MB → {m['peak_mb']:.1f}MB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="합성 워크북으로 대시보드 처리 단계별 소요시간·최대 메모리 측정")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="스타일 수 (기본: 1000 10000 100000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "onlinedash-bench"), help="합성 워크북/스냅샷 저장 위치")
+    parser.add_argument("--json", help="결과를 JSON 으로 저장할 경로")
+    parser.add_argument("--compare", help="비교할 이전 JSON 결과")
+    parser.add_argument("--fetch-latency", type=float, default=0.0, help="가짜 Google 백엔드의 export/values 호출 지연(초)")
+    parser.add_argument("--fallback", action="store_true", help="export 를 실패시켜 values.batchGet 폴백 경로로 가져오기")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="회귀로 볼 증가 비율 (기본 0.25)")
+    args = parser.parse_args(argv)
+
+    os.environ["SNAPSHOT_DIR"] = os.path.join(args.workdir, "snapshots")
+    logging.disable(logging.WARNING)  # bare 모드 실행 경고(ScriptRunContext 없음 등) 생략
+
+    tracemalloc.start()
+    results = []
+    for n in args.sizes:
+        results.append(run_size(n, args.seed, args.workdir, args.fetch_latency, args.fallback))
+        print(format_results(results[-1:]), flush=True)
+    tracemalloc.stop()
+    print(f"peak RSS: {_peak_rss_mb()} MB")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"created": datetime.now().isoformat(timespec="seconds"), "results": results, "peak_rss_mb": _peak_rss_mb()}, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare_results(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
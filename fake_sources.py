@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""Google Drive/Sheets 대신 로컬 픽스처 워크북을 돌려주는 소스 백엔드 (오프라인·CI 부하 테스트용).
+
+pipeline.GoogleBackend 와 같은 호출(파일 메타데이터, xlsx export, 워크시트 목록, values.batchGet)을 흉내 내므로
+버전 확인 → export → (실패 시) values 폴백 경로가 실제와 똑같이 돈다. 호출별 지연·오류·수정 시각을 정할 수 있고,
+호출 수와 동시 호출 수(최대치)를 센다.
+
+    from fake_sources import FakeSheetsBackend
+    backend = FakeSheetsBackend({"inout": base_bytes, "online": online_bytes}, latency={"export": 0.5, "values": 0.2})
+    pipeline.set_source_backend(backend)
+    backend.fail("export", times=1)  # 다음 export 1회 실패 → values.batchGet 폴백
+    backend.touch("online")          # 버전/수정 시각 갱신 → 다음 버전 확인 때 새로 받음
+
+SOURCE_BACKEND=fake:<디렉터리> 로 실행하면 <디렉터리>/<시트 id>.xlsx 가 픽스처가 된다 (inout.xlsx, online.xlsx).
+"""
+import os
+import time
+import random
+import threading
+import contextlib
+from io import BytesIO
+from datetime import datetime, timezone
+
+OPS = ("metadata", "export", "titles", "values")
+
+
+class FakeSourceError(Exception):
+    """주입된 오류 또는 없는 시트 (Google API 의 HttpError 자리)."""
+
+
+def _cell_text(v):
+    # values.get 기본값(FORMATTED_VALUE)처럼 모든 셀을 문자열로
+    if v is None:
+        return ""
+    if isinstance(v, bool):
+        return "TRUE" if v else "FALSE"
+    if isinstance(v, datetime):
+        return v.strftime("%Y-%m-%d") if (v.hour, v.minute, v.second) == (0, 0, 0) else v.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+def _sheet_rows(xlsx_bytes):
+    """{워크시트: 행 리스트}. Sheets API 처럼 행 끝의 빈 셀과 끝쪽 빈 행은 잘라낸다."""
+    from openpyxl import load_workbook
+    wb = load_workbook(BytesIO(xlsx_bytes), read_only=True, data_only=True)
+    try:
+        book = {}
+        for ws in wb.worksheets:
+            rows = []
+            for row in ws.iter_rows(values_only=True):
+                cells = [_cell_text(v) for v in row]
+                while cells and cells[-1] == "":
+                    cells.pop()
+                rows.append(cells)
+            while rows and not rows[-1]:
+                rows.pop()
+            book[ws.title] = rows
+        return book
+    finally:
+        wb.close()
+
+
+def _range_title(a1_range):
+    if a1_range.startswith("'"):
+        return a1_range[1:a1_range.rindex("'")].replace("''", "'")
+    return a1_range.split("!")[0]
+
+
+class FakeSheetsBackend:
+    def __init__(self, fixtures, latency=0.0, error_rate=None, seed=0, sheet_ids=None, modified_times=None):
+        """fixtures: {시트 id: xlsx 바이트}. latency: 초 또는 {호출: 초} (호출 = OPS 중 하나).
+        error_rate: {호출: 0~1 실패 확률} (seed 로 재현). sheet_ids: {"inout": id, "online": id} (기본: 같은 이름의 픽스처).
+        modified_times: {시트 id: datetime} (기본: 지금)."""
+        self._lock = threading.Lock()
+        now = datetime.now(timezone.utc)
+        self._fixtures = dict(fixtures)
+        self._versions = dict.fromkeys(self._fixtures, 1)
+        self._modified = {sid: (modified_times or {}).get(sid, now) for sid in self._fixtures}
+        self._rows = {}  # 시트 id → {워크시트: 행 리스트} (values 응답용 변환 결과)
+        self._failures = []  # [호출, 시트 id(None=전체), 남은 횟수(None=무한)]
+        self._random = random.Random(seed)
+        self._sheet_ids = dict(sheet_ids) if sheet_ids else {k: k for k in ("inout", "online") if k in self._fixtures}
+        self.latency = dict(latency) if isinstance(latency, dict) else dict.fromkeys(OPS, float(latency))
+        self.error_rate = dict(error_rate or {})
+        self.reset_stats()
+
+    @classmethod
+    def from_dir(cls, path, **kwargs):
+        """<path>/<시트 id>.xlsx 를 픽스처로, 파일 mtime 을 수정 시각으로."""
+        fixtures, modified = {}, {}
+        for name in sorted(os.listdir(path)):
+            sheet_id, ext = os.path.splitext(name)
+            if ext.lower() != ".xlsx":
+                continue
+            full = os.path.join(path, name)
+            with open(full, "rb") as f:
+                fixtures[sheet_id] = f.read()
+            modified[sheet_id] = datetime.fromtimestamp(os.path.getmtime(full), timezone.utc)
+        modified.update(kwargs.pop("modified_times", None) or {})
+        return cls(fixtures, modified_times=modified, **kwargs)
+
+    # ---- 조작/통계 ----
+    def set_fixture(self, sheet_id, xlsx_bytes, when=None):
+        """내용 교체 (+ 버전/수정 시각 갱신)."""
+        with self._lock:
+            self._fixtures[sheet_id] = xlsx_bytes
+            self._rows.pop(sheet_id, None)
+        self.touch(sheet_id, when)
+
+    def touch(self, sheet_id, when=None):
+        with self._lock:
+            self._versions[sheet_id] = self._versions.get(sheet_id, 0) + 1
+            self._modified[sheet_id] = when or datetime.now(timezone.utc)
+
+    def fail(self, op, sheet_id=None, times=None):
+        """이후 op 호출을 times 번(None 이면 heal() 까지) 실패시킨다. sheet_id 를 주면 그 시트만."""
+        if op not in OPS:
+            raise ValueError(f"op 은 {OPS} 중 하나: {op!r}")
+        with self._lock:
+            self._failures.append([op, sheet_id, times])
+
+    def heal(self):
+        with self._lock:
+            self._failures.clear()
+            self.error_rate.clear()
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls = dict.fromkeys(OPS, 0)
+            self.errors = dict.fromkeys(OPS, 0)
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+    def stats(self):
+        with self._lock:
+            return {"calls": dict(self.calls), "errors": dict(self.errors), "max_in_flight": self.max_in_flight}
+
+    def _take_failure(self, op, sheet_id):
+        for failure in self._failures:
+            if failure[0] == op and failure[1] in (None, sheet_id):
+                if failure[2] is not None:
+                    failure[2] -= 1
+                    if failure[2] <= 0:
+                        self._failures.remove(failure)
+                return True
+        return self._random.random() < self.error_rate.get(op, 0.0)
+
+    @contextlib.contextmanager
+    def _call(self, op, sheet_id):
+        with self._lock:
+            self.calls[op] += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            failed = self._take_failure(op, sheet_id)
+        try:
+            if self.latency.get(op):
+                time.sleep(self.latency[op])
+            if failed or sheet_id not in self._fixtures:
+                with self._lock:
+                    self.errors[op] += 1
+                raise FakeSourceError(f"{op} {sheet_id}: {'주입된 오류' if failed else '없는 시트'}")
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _sheet_rows(self, sheet_id):
+        with self._lock:
+            rows, data = self._rows.get(sheet_id), self._fixtures[sheet_id]
+        if rows is None:
+            rows = _sheet_rows(data)
+            with self._lock:
+                if self._fixtures.get(sheet_id) is data:
+                    self._rows[sheet_id] = rows
+        return rows
+
+    # ---- pipeline.GoogleBackend 와 같은 인터페이스 ----
+    def sheet_ids(self):
+        return dict(self._sheet_ids)
+
+    def credentials(self):
+        return "fake-credentials"
+
+    def file_metadata(self, sheet_id, creds):
+        with self._call("metadata", sheet_id), self._lock:
+            modified = self._modified[sheet_id].astimezone(timezone.utc)
+            return {"version": str(self._versions[sheet_id]), "modifiedTime": modified.strftime("%Y-%m-%dT%H:%M:%S.") + f"{modified.microsecond // 1000:03d}Z"}
+
+    def export_xlsx(self, sheet_id, creds):
+        with self._call("export", sheet_id), self._lock:
+            return self._fixtures[sheet_id]
+
+    def sheet_titles(self, sheet_id, creds):
+        with self._call("titles", sheet_id):
+            return list(self._sheet_rows(sheet_id))
+
+    def batch_get_values(self, sheet_id, ranges, creds):
+        with self._call("values", sheet_id):
+            book = self._sheet_rows(sheet_id)
+            value_ranges = []
+            for a1_range in ranges:
+                title = _range_title(a1_range)
+                if title not in book:
+                    raise FakeSourceError(f"values {sheet_id}: 없는 범위 {a1_range}")
+                rows = book[title]
+                value_ranges.append({"range": a1_range, "majorDimension": "ROWS", **({"values": rows} if rows else {})})
+            return {"spreadsheetId": sheet_id, "valueRanges": value_ranges}
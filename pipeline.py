@@ -0,0 +1,1740 @@
+# -*- coding: utf-8 -*-
+"""입출고/온라인 등록 데이터 파이프라인: 가져오기 → 정규화 → 집계 → 리드타임.
+
+Streamlit 화면(app.py)과 분리되어 있어 import 해서 쓰거나 배치로 돌릴 수 있다.
+
+    python pipeline.py --base 입출고.xlsx --online 온라인등록.xlsx --out out/ --format parquet
+"""
+from __future__ import annotations
+
+import os
+import sys
+import mmap
+import json
+import time
+import sqlite3
+import hashlib
+import inspect
+import argparse
+import functools
+import logging
+import threading
+import streamlit as st
+import numpy as np
+import pandas as pd
+from io import BytesIO
+from contextlib import closing, contextmanager
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from google.oauth2.service_account import Credentials
+
+# ---- 설정 ----
+def read_secret(key, default=""):
+    try:
+        v = st.secrets.get(key, default) or default
+        return str(v).strip() if v else default
+    except Exception:
+        return default
+
+# 입출고용: BASE_SPREADSHEET_ID / 온라인등록용: ONLINE_SPREADSHEET_ID 하나만 사용 (secrets에서 관리)
+BASE_SPREADSHEET_ID = str(read_secret("BASE_SPREADSHEET_ID")).strip() or ""
+ONLINE_SPREADSHEET_ID = str(read_secret("ONLINE_SPREADSHEET_ID")).strip() or ""
+GOOGLE_SPREADSHEET_IDS = {"inout": BASE_SPREADSHEET_ID}
+# 온라인 스프레드시트 내 워크시트 이름 = 브랜드명 (예: 스파오 시트에서 스파오 데이터)
+BRAND_KEY_TO_SHEET_NAME = {"spao": "스파오", "whoau": "후아유", "clavis": "클라비스", "mixxo": "미쏘", "roem": "로엠", "shoopen": "슈펜", "eblin": "에블린"}
+brands_list = ["스파오", "뉴발란스", "뉴발란스키즈", "후아유", "슈펜", "미쏘", "로엠", "클라비스", "에블린"]
+bu_groups = [("캐쥬얼BU", ["스파오"]), ("스포츠BU", ["뉴발란스", "뉴발란스키즈", "후아유", "슈펜"]), ("여성BU", ["미쏘", "로엠", "클라비스", "에블린"])]
+BRAND_TO_KEY = {"스파오": "spao", "후아유": "whoau", "클라비스": "clavis", "미쏘": "mixxo", "로엠": "roem", "슈펜": "shoopen", "에블린": "eblin"}
+NO_REG_SHEET_BRANDS = {"뉴발란스", "뉴발란스키즈"}
+SEASON_OPTIONS = ["1", "2", "A", "S", "F"]
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_CHECK_TTL = 60  # Drive 메타데이터(modifiedTime/version) 확인 주기(초)
+SOURCE_FALLBACK_TTL = 300  # 메타데이터 조회 불가 시 전체 재다운로드 주기(초)
+REFRESH_INTERVAL = max(10, int(os.environ.get("REFRESH_INTERVAL", "").strip() or SOURCE_CHECK_TTL))  # 백그라운드 갱신 주기(초)
+FETCH_MAX_WORKERS = max(1, int(read_secret("FETCH_MAX_WORKERS") or os.environ.get("FETCH_MAX_WORKERS", "").strip() or 4))  # Google 동시 요청 수
+GOOGLE_SCOPES = ["https://www.googleapis.com/auth/spreadsheets.readonly", "https://www.googleapis.com/auth/drive.readonly"]
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# ---- 캐시 ----
+# streamlit run 으로 실행될 때는 st.cache_data / st.cache_resource 를 그대로 쓰고, CLI·배치처럼 Streamlit 런타임이
+# 없으면 같은 키 규칙(밑줄로 시작하는 인자는 제외)과 같은 ttl/max_entries 의 프로세스 메모리 캐시를 쓴다.
+# 워크북 원본은 SourceHandle 로 감싸 넘기면 두 캐시 모두 내용 digest 로 키를 만든다 (원본 바이트 재해시 없음).
+def _has_streamlit_runtime():
+    try:
+        from streamlit.runtime import exists
+        return exists()
+    except Exception:
+        return False
+
+def _args_fingerprint(args, kwargs):
+    h = hashlib.sha1()
+
+    def feed(v):
+        if isinstance(v, (bytes, bytearray)):
+            h.update(v)
+        elif isinstance(v, dict):
+            for k in sorted(v, key=repr):
+                feed(k)
+                feed(v[k])
+        elif isinstance(v, (list, tuple)):
+            for x in v:
+                feed(x)
+        elif isinstance(v, pd.DataFrame):  # repr 은 잘려서 출력되므로 내용 해시로
+            h.update(repr(list(v.columns)).encode("utf-8"))
+            h.update(pd.util.hash_pandas_object(v.astype(str), index=True).values.tobytes())
+        else:
+            h.update(repr(v).encode("utf-8"))
+        h.update(b"|")
+    feed(args)
+    feed(kwargs)
+    return h.hexdigest()
+
+_local_cache_stores = []
+
+def _local_cache(fn=None, *, ttl=None, max_entries=None, **_st_kwargs):
+    """Streamlit 런타임이 없을 때의 st.cache_data/st.cache_resource 대용. ttl(초 또는 timedelta)이 지난 항목은 다시 계산하고,
+    max_entries 를 넘으면 가장 오래 안 쓴 항목부터 버린다 (show_spinner 등 화면 옵션은 무시)."""
+    if fn is None:
+        return functools.partial(_local_cache, ttl=ttl, max_entries=max_entries)
+    ttl = ttl.total_seconds() if isinstance(ttl, timedelta) else ttl
+    params = list(inspect.signature(fn).parameters)
+    store, lock = OrderedDict(), threading.Lock()  # 키 → (값, 만료 시각 또는 None), 최근 사용 순
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        named = [(params[i] if i < len(params) else "", v) for i, v in enumerate(args)] + list(kwargs.items())
+        key = _args_fingerprint(tuple((n, v) for n, v in named if not n.startswith("_")), {})
+        with lock:
+            if key in store and (store[key][1] is None or time.monotonic() < store[key][1]):
+                store.move_to_end(key)
+                return store[key][0]
+        value = fn(*args, **kwargs)
+        with lock:
+            store[key] = (value, None if ttl is None else time.monotonic() + ttl)
+            store.move_to_end(key)
+            while max_entries and len(store) > max_entries:
+                store.popitem(last=False)
+        return value
+    wrapper.clear = store.clear
+    _local_cache_stores.append(store)
+    return wrapper
+
+class SourceHandle:
+    """워크북 소스(xlsx 바이트 / LocalFile / Sheets API 폴백 {시트명: DataFrame})와 내용 digest, 워크시트 선택자.
+    digest 는 만들 때 한 번만 계산하고 캐시 키는 (digest, sheet) 만 쓰므로, 수 MB 원본을 호출마다 다시 해시하지 않는다."""
+    __slots__ = ("data", "digest", "sheet", "_sheet_names")
+
+    def __init__(self, data, digest=None, sheet=None):
+        self.data = data
+        self.digest = digest or _content_digest(data)
+        self.sheet = sheet
+        self._sheet_names = None
+
+    @classmethod
+    def of(cls, src):
+        """핸들이면 그대로, 원본이면 digest 를 계산해 감싼다."""
+        return src if isinstance(src, cls) else cls(src)
+
+    def with_sheet(self, sheet):
+        if sheet == self.sheet:
+            return self
+        handle = SourceHandle(self.data, self.digest, sheet)
+        handle._sheet_names = self._sheet_names
+        return handle
+
+    def sheet_names(self):
+        if self._sheet_names is None:
+            with _workbook_reader(self.data) as (names, _):
+                self._sheet_names = names
+        return self._sheet_names
+
+    def __len__(self):
+        return len(self.data)
+
+    def __reduce__(self):
+        return (SourceHandle, (self.data, self.digest, self.sheet))
+
+    def __repr__(self):
+        return f"SourceHandle({self.digest}, sheet={self.sheet!r})"
+
+SOURCE_HASH_FUNCS = {SourceHandle: lambda handle: (handle.digest, handle.sheet)}
+
+# 파생 캐시(파싱 프레임·최초입고일 맵·리드타임·집계)에는 TTL 을 두지 않는다. 키에 소스 digest 가 들어가므로 소스가 바뀌면
+# 새 키로 정확히 한 번 계산되고, 바뀌기 전에는 다시 계산하지 않는다. 지난 버전 항목은 max_entries(LRU)로 밀려난다.
+# 시간 기준 만료는 소스 쪽(Drive 메타데이터 확인 SOURCE_CHECK_TTL)에만 남긴다.
+CACHE_VERSIONS = 2  # 함수별로 남겨 둘 데이터 버전 수 (현재 버전 + 백그라운드에서 준비 중인 다음 버전)
+N_SOURCES = len(BRAND_KEY_TO_SHEET_NAME) + 1  # 버전당 워크북 수 상한 (입출고 + 브랜드별 파일)
+
+def cache_data(**kwargs):
+    if not _has_streamlit_runtime():
+        return _local_cache(**kwargs)  # _args_fingerprint 는 SourceHandle 을 repr(digest) 로 해시
+    return st.cache_data(**{**kwargs, "hash_funcs": {**SOURCE_HASH_FUNCS, **kwargs.get("hash_funcs", {})}})
+
+def cache_resource(fn=None, **kwargs):
+    """@cache_resource 와 @cache_resource(ttl=...) 둘 다 지원."""
+    deco = st.cache_resource(**{**kwargs, "hash_funcs": {**SOURCE_HASH_FUNCS, **kwargs.get("hash_funcs", {})}}) if _has_streamlit_runtime() else _local_cache(**kwargs)
+    return deco(fn) if fn is not None else deco
+
+def clear_caches():
+    """모든 계산 캐시 비우기 (디스크 스냅샷은 유지)."""
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    for store in _local_cache_stores:
+        store.clear()
+
+# ---- 성능 계측 ----
+# 단계별 소요시간과 st.cache_data 적중/미스/재계산 횟수를 프로세스 단위로 모은다. 세션의 한 번 실행(rerun) 동안의
+# 이벤트는 따로 묶어 실행이 끝날 때 구조화 로그 한 줄(onlinedash.perf)로 남기고, ?perf=1 이면 화면 하단 표로 보여준다.
+# 미스 = 처음 보는 인자로 계산, 재계산 = 전에 계산한 인자인데 TTL 만료/캐시 축출로 다시 계산.
+PERF_LOGGER = logging.getLogger("onlinedash.perf")
+PERF_COUNTERS = {"hit": "hits", "miss": "misses", "recompute": "recomputes"}
+
+class PerfStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}  # 이름 → calls/hits/misses/recomputes, seconds(누적), compute_seconds(누적), last_seconds
+        self._seen = {}  # 이름 → 계산한 적 있는 인자 지문
+        self._runs = {}  # session_id → 이번 실행의 [(이름, 소요초, 종류)]
+
+    def record(self, name, seconds, kind, fingerprint=None, compute_seconds=0.0):
+        """kind: "hit" | "miss" | "run"(캐시 없는 단계). miss 는 지문으로 미스/재계산을 구분한다."""
+        with self._lock:
+            stage = self.stages.setdefault(name, {"calls": 0, **dict.fromkeys(PERF_COUNTERS.values(), 0), "seconds": 0.0, "compute_seconds": 0.0, "last_seconds": 0.0})
+            if kind == "miss":
+                seen = self._seen.setdefault(name, set())
+                kind = "recompute" if fingerprint in seen else "miss"
+                if len(seen) > 256:
+                    seen.clear()
+                seen.add(fingerprint)
+            stage["calls"] += 1
+            if kind in PERF_COUNTERS:
+                stage[PERF_COUNTERS[kind]] += 1
+            stage["seconds"] += seconds
+            stage["compute_seconds"] += compute_seconds if kind != "run" else seconds
+            stage["last_seconds"] = seconds
+            session_id = perf_session_id()
+            if session_id is not None and session_id in self._runs:
+                self._runs[session_id].append((name, seconds, kind))
+
+    def begin_run(self, session_id):
+        with self._lock:
+            self._runs[session_id] = []
+
+    def end_run(self, session_id):
+        with self._lock:
+            return self._runs.pop(session_id, [])
+
+    def snapshot(self):
+        with self._lock:
+            return {name: dict(stage) for name, stage in self.stages.items()}
+
+@cache_resource
+def perf_stats():
+    return PerfStats()
+
+def perf_session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+_perf_local = threading.local()
+
+def _perf_frames():
+    if not hasattr(_perf_local, "frames"):
+        _perf_local.frames = []
+    return _perf_local.frames
+
+def tracked_cache_data(name=None, flight="compute", **cache_kwargs):
+    """st.cache_data + 계측. 계산 함수는 캐시 미스일 때만 실행되므로 그 안에서 미스를 표시하고, 바깥 래퍼가 호출 시간을 기록.
+    미스 계산은 RefreshCoordinator 를 거쳐 같은 인자의 동시 계산을 한 번으로 합친다 (flight: 지표 분류명)."""
+    def deco(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            frame = _perf_frames()[-1] if _perf_frames() else {}
+            fingerprint = frame["fingerprint"] = _args_fingerprint(args, kwargs)
+            t0 = time.perf_counter()
+            try:
+                return refresh_coordinator().run(flight, (label, fingerprint), lambda: fn(*args, **kwargs))
+            finally:
+                frame["compute_seconds"] = time.perf_counter() - t0
+
+        cached = cache_data(**cache_kwargs)(compute)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            frames = _perf_frames()
+            frames.append({})
+            t0 = time.perf_counter()
+            try:
+                return cached(*args, **kwargs)
+            finally:
+                frame = frames.pop()
+                kind = "miss" if "fingerprint" in frame else "hit"
+                perf_stats().record(label, time.perf_counter() - t0, kind, frame.get("fingerprint"), frame.get("compute_seconds", 0.0))
+        wrapper.clear = cached.clear
+        return wrapper
+    return deco
+
+class perf_timer:
+    """캐시 없는 단계 계측. with perf_timer("html.monitor_table"): ... 또는 @perf_timer("load_base_inout")."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        perf_stats().record(self.name, time.perf_counter() - self._t0, "run")
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with perf_timer(self.name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+def perf_log_run(session_id, events):
+    """실행 한 번의 단계별 이벤트를 JSON 한 줄로 기록."""
+    total = {}
+    for name, seconds, kind in events:
+        t = total.setdefault(name, {"seconds": 0.0, "calls": 0, "kinds": {}})
+        t["seconds"] += seconds
+        t["calls"] += 1
+        t["kinds"][kind] = t["kinds"].get(kind, 0) + 1
+    PERF_LOGGER.info(json.dumps({"session": session_id, "stages": {k: {**v, "seconds": round(v["seconds"], 4)} for k, v in total.items()}}, ensure_ascii=False))
+    return total
+
+# ---- 단일 실행(single-flight) 조정 ----
+# TTL 만료나 새 소스 버전 직후 여러 세션이 같은 다운로드(fetch)·워크북 파싱(parse)·캐시 값 계산(compute)을 동시에 시작하지 않도록,
+# 키마다 먼저 온 호출 하나만 실행하고 나머지는 그 결과(또는 예외)를 기다려 함께 받는다. 세션 화면은 그동안
+# SourceRefresher 가 마지막 정상 데이터 버전을 계속 제공한다. 합류(joined) 수 = 막아 낸 중복 로드 수.
+class _Flight:
+    __slots__ = ("owner", "done", "result", "error")
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class RefreshCoordinator:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}  # (종류, 키) → 진행 중인 _Flight
+        self._stats = {}  # 종류 → runs/joined/errors/wait_seconds
+
+    def run(self, kind, key, fn):
+        me = threading.get_ident()
+        with self._lock:
+            stat = self._stats.setdefault(kind, {"runs": 0, "joined": 0, "errors": 0, "wait_seconds": 0.0})
+            flight = self._flights.get((kind, key))
+            reentrant = flight is not None and flight.owner == me
+            leader = flight is None
+            if leader:
+                flight = self._flights[(kind, key)] = _Flight(me)
+                stat["runs"] += 1
+            elif not reentrant:
+                stat["joined"] += 1
+        if reentrant:  # 같은 스레드가 자기 계산 안에서 같은 키를 다시 요청 → 기다리지 않고 직접 실행
+            return fn()
+        if not leader:
+            t0 = time.perf_counter()
+            flight.done.wait()
+            with self._lock:
+                stat["wait_seconds"] += time.perf_counter() - t0
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                stat["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop((kind, key), None)
+            flight.done.set()
+
+    def snapshot(self):
+        with self._lock:
+            in_flight = {}
+            for kind, _ in self._flights:
+                in_flight[kind] = in_flight.get(kind, 0) + 1
+            return {kind: {**stat, "in_flight": in_flight.get(kind, 0)} for kind, stat in self._stats.items()}
+
+@cache_resource
+def refresh_coordinator():
+    return RefreshCoordinator()
+
+def refresh_metrics():
+    """종류별 실행/합류(중복 방지)/오류/대기 시간과, 갱신 중 이전 데이터 버전으로 응답한 세션 수."""
+    rows = [{"종류": kind, "실행": v["runs"], "합류(중복 방지)": v["joined"], "오류": v["errors"], "대기(초)": round(v["wait_seconds"], 3), "진행 중": v["in_flight"]}
+            for kind, v in sorted(refresh_coordinator().snapshot().items())]
+    refresher = _source_refresher()
+    rows.append({"종류": "session(이전 버전 제공)", "실행": refresher.refreshes, "합류(중복 방지)": refresher.stale_served, "오류": int(refresher.last_error is not None), "대기(초)": 0.0, "진행 중": int(refresher.refreshing)})
+    return pd.DataFrame(rows)
+
+# ---- 병렬 실행 ----
+@cache_resource
+def _fetch_slots():
+    """프로세스 전체에서 동시에 나가는 Google 다운로드 요청 수를 FETCH_MAX_WORKERS 로 제한."""
+    return threading.BoundedSemaphore(FETCH_MAX_WORKERS)
+
+def _run_parallel(tasks, max_workers):
+    """{이름: 인자 없는 함수} 를 스레드 풀에서 실행해 {이름: (결과, 소요초)} 반환.
+    작업 스레드에 현재 ScriptRunContext 를 붙여 st.cache_* 가 메인 스레드와 같게 동작하도록 한다."""
+    from concurrent.futures import ThreadPoolExecutor
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    ctx = get_script_run_ctx()
+
+    def timed(fn):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        t0 = time.perf_counter()
+        result = fn()
+        return result, time.perf_counter() - t0
+
+    if not tasks:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks)))) as pool:
+        futures = {name: pool.submit(timed, fn) for name, fn in tasks.items()}
+        return {name: f.result() for name, f in futures.items()}
+
+# ---- Google 인증/시트 ----
+def _get_google_credentials():
+    import json
+    try:
+        raw = getattr(st.secrets, "get", lambda k, d=None: None)("google_service_account") or read_secret("google_service_account")
+        if raw:
+            info = json.loads(raw) if isinstance(raw, str) else dict(raw)
+            if "type" in info and "private_key" in info:
+                return Credentials.from_service_account_info(info, scopes=GOOGLE_SCOPES)
+    except Exception:
+        pass
+    creds_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+    if not creds_path or not os.path.isfile(creds_path):
+        for name in ("service_account.json", "credentials.json"):
+            p = os.path.join(BASE_DIR, name)
+            if os.path.isfile(p):
+                creds_path = p
+                break
+    if not creds_path:
+        return None
+    try:
+        return Credentials.from_service_account_file(creds_path, scopes=GOOGLE_SCOPES)
+    except Exception:
+        return None
+
+# ---- 소스 백엔드 ----
+# Google Drive/Sheets 호출은 모두 백엔드 객체 하나를 거친다. 기본은 실제 API(GoogleBackend)이고, 오프라인 부하 테스트는
+# fake_sources.FakeSheetsBackend 로 바꿔 끼운다 (SOURCE_BACKEND=fake:<픽스처 디렉터리> 또는 set_source_backend()).
+# 메서드는 실패 시 예외를 그대로 올리고, 폴백/재시도 판단은 호출하는 쪽(fetch_sheet_bytes 등)이 한다.
+SOURCE_LOGGER = logging.getLogger("onlinedash.source")
+
+class GoogleBackend:
+    def sheet_ids(self):
+        """{"inout": 입출고 스프레드시트 id, "online": 온라인 등록 스프레드시트 id}"""
+        return {"inout": BASE_SPREADSHEET_ID, "online": ONLINE_SPREADSHEET_ID}
+
+    def credentials(self):
+        return _get_google_credentials()
+
+    def _service(self, api, version, creds):
+        # googleapiclient service(httplib2)는 스레드 간 공유 불가 → 호출마다 새로 생성
+        from googleapiclient.discovery import build
+        return build(api, version, credentials=creds, cache_discovery=False)
+
+    def file_metadata(self, sheet_id, creds):
+        """Drive files.get → {"version", "modifiedTime"}"""
+        return self._service("drive", "v3", creds).files().get(fileId=sheet_id, fields="modifiedTime,version", supportsAllDrives=True).execute()
+
+    def export_xlsx(self, sheet_id, creds):
+        """Drive files.export 로 받은 xlsx 바이트."""
+        from googleapiclient.http import MediaIoBaseDownload
+        fh = BytesIO()
+        downloader = MediaIoBaseDownload(fh, self._service("drive", "v3", creds).files().export_media(fileId=sheet_id, mimeType=XLSX_MIME))
+        done = False
+        while not done:
+            _, done = downloader.next_chunk()
+        return fh.getvalue()
+
+    def sheet_titles(self, sheet_id, creds):
+        meta = self._service("sheets", "v4", creds).spreadsheets().get(spreadsheetId=sheet_id, fields="sheets.properties.title").execute()
+        return [s["properties"]["title"] for s in meta.get("sheets", [])]
+
+    def batch_get_values(self, sheet_id, ranges, creds):
+        """Sheets values.batchGet 응답 그대로 ({"valueRanges": [{"values": [[...], ...]}, ...]})."""
+        return self._service("sheets", "v4", creds).spreadsheets().values().batchGet(spreadsheetId=sheet_id, ranges=ranges).execute()
+
+_source_backend = None
+
+def source_backend():
+    """SOURCE_BACKEND=google | local:<폴더> | fake:<픽스처 폴더>. 미지정이면 Google id 가 없고 DB/ 폴더가 있을 때 로컬 폴더."""
+    global _source_backend
+    if _source_backend is None:
+        spec = os.environ.get("SOURCE_BACKEND", "").strip()
+        if spec.startswith("fake:"):
+            from fake_sources import FakeSheetsBackend
+            _source_backend = FakeSheetsBackend.from_dir(spec[len("fake:"):], latency=float(os.environ.get("FAKE_SOURCE_LATENCY", "").strip() or 0))
+        elif spec.startswith("local:"):
+            _source_backend = LocalFolderBackend(spec[len("local:"):])
+        elif not spec and not (BASE_SPREADSHEET_ID or ONLINE_SPREADSHEET_ID) and os.path.isdir(LOCAL_DB_DIR):
+            _source_backend = LocalFolderBackend(LOCAL_DB_DIR)
+        else:
+            _source_backend = GoogleBackend()
+    return _source_backend
+
+def set_source_backend(backend):
+    """소스 백엔드 교체 (테스트/벤치용). 이전 백엔드를 반환하고, 버전 확인·다운로드 캐시를 비운다."""
+    global _source_backend
+    prev, _source_backend = _source_backend, backend
+    get_source_version.clear()
+    fetch_sheet_bytes.clear()
+    return prev
+
+# ---- 로컬 DB/ 폴더 소스 ----
+# 사내 야간 배포처럼 엑셀 파일을 폴더에 떨궈 주는 환경용. 파일 내용은 BytesIO 로 복사하지 않고 mmap 으로 읽고,
+# 캐시 키는 파일 내용 digest (파일이 바뀔 때만 다시 계산) 라서 내용이 바뀐 브랜드의 파싱 캐시만 다시 계산된다.
+# 파일은 임시 이름으로 쓴 뒤 이름을 바꿔 넣을 것 — 읽는 중인 파일을 제자리에서 잘라 쓰면 mmap 읽기가 깨진다.
+LOCAL_DB_DIR = os.path.join(BASE_DIR, "DB")
+LOCAL_SETTLE_SECONDS = 5  # 이보다 최근에 수정된 파일은 아직 쓰는 중일 수 있어 다음 확인 때 반영
+LOCAL_BASE_KEYWORDS = ("DB", "입출고")
+LOCAL_ONLINE_KEYWORDS = ("온라인", "online")
+
+class _SeekableMmap(mmap.mmap):
+    """zipfile(openpyxl)이 요구하는 파일 객체 메서드 보충 (mmap 에는 3.13 부터 있음)."""
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+class LocalFile:
+    """로컬 엑셀 파일 핸들. 소스 dict 에는 SourceHandle 로 감싸 xlsx 바이트 자리에 들어간다.
+    감싸지 않고 넘기면 st.cache_data 는 __reduce__ 로 해시하므로 (경로, mtime, 크기) 가 캐시 키가 된다."""
+    __slots__ = ("path", "mtime_ns", "size", "_digest")
+
+    def __init__(self, path, mtime_ns, size):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self._digest = None
+
+    @classmethod
+    def stat(cls, path):
+        info = os.stat(path)
+        return cls(os.path.abspath(path), info.st_mtime_ns, info.st_size)
+
+    def __len__(self):
+        return self.size
+
+    def __reduce__(self):
+        return (LocalFile, (self.path, self.mtime_ns, self.size))
+
+    def __eq__(self, other):
+        return isinstance(other, LocalFile) and self.__reduce__() == other.__reduce__()
+
+    def __hash__(self):
+        return hash(self.__reduce__()[1])
+
+    def __repr__(self):
+        return f"LocalFile({self.path!r}, mtime_ns={self.mtime_ns}, size={self.size})"
+
+    def open(self):
+        """읽기 전용 mmap (파일 객체처럼 seek/read). 호출마다 새로 열어 스레드 간 위치를 공유하지 않는다."""
+        with open(self.path, "rb") as f:
+            return _SeekableMmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def digest(self):
+        if self._digest is None:
+            with self.open() as m:
+                self._digest = hashlib.sha256(m).hexdigest()
+        return self._digest
+
+class LocalFolderBackend:
+    """폴더 안 xlsx 를 get_all_sources() 와 같은 소스 키로 매핑.
+    입출고: 이름에 DB/입출고 가 들어간 가장 최근 파일. 브랜드: 이름에 브랜드명이 들어간 파일,
+    없으면 이름에 온라인/online 이 들어간 통합 워크북 (브랜드명 워크시트)."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self._files = {}  # 경로 → 마지막으로 채택한 LocalFile (내용이 같으면 같은 객체를 돌려줘 digest 재사용)
+        self._handles = {}  # LocalFile → SourceHandle
+        self._lock = threading.Lock()
+
+    def _scan(self):
+        now_ns = time.time_ns()
+        found = []
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                if not entry.is_file() or entry.name.startswith(("~$", ".")) or not entry.name.lower().endswith(".xlsx"):
+                    continue
+                info = entry.stat()
+                prev = self._files.get(entry.path)
+                if prev is not None and (prev.mtime_ns, prev.size) == (info.st_mtime_ns, info.st_size):
+                    found.append(prev)
+                elif info.st_size == 0 or now_ns - info.st_mtime_ns < LOCAL_SETTLE_SECONDS * 1e9:
+                    # 쓰는 중 → 이전 핸들 유지. 새로 나타난 파일은 자리 잡을 때까지 없는 것으로 보고 이전 선택을 쓴다
+                    if prev is not None:
+                        found.append(prev)
+                else:
+                    found.append(LocalFile(entry.path, info.st_mtime_ns, info.st_size))
+        self._files = {f.path: f for f in found}
+        return sorted(found, key=lambda f: f.mtime_ns, reverse=True)
+
+    def _pick(self, files, keywords):
+        for f in files:
+            name = os.path.basename(f.path)
+            if any(k.lower() in name.lower() for k in keywords):
+                return f
+        return None
+
+    def sources(self):
+        with self._lock:
+            files = self._scan() if os.path.isdir(self.folder) else []
+            online = self._pick(files, LOCAL_ONLINE_KEYWORDS)
+            picked = {"inout": self._pick([f for f in files if f is not online], LOCAL_BASE_KEYWORDS)}
+            for brand_key, sheet_name in BRAND_KEY_TO_SHEET_NAME.items():
+                picked[brand_key] = self._pick(files, (sheet_name,)) or online
+            # 같은 파일은 같은 핸들 (통합 워크북을 쓰는 브랜드들이 한 객체를 공유)
+            handles = {}
+            for f in set(picked.values()) - {None}:
+                try:
+                    handles[f] = self._handles.get(f) or SourceHandle(f, f.digest())
+                except (OSError, ValueError):  # 확인 직후 지워졌거나 잘린 파일 → 이번에는 없는 소스 (직전 데이터 버전 유지)
+                    SOURCE_LOGGER.warning("로컬 파일 읽기 실패: %s", f.path, exc_info=True)
+            self._handles = handles
+            return {key: (handles.get(f), key) for key, f in picked.items()}
+
+def _fetch_sheet_via_api(sid, creds):
+    """export 실패 시 Sheets API values.batchGet 으로 전체 워크시트를 받아 {시트명: header=None DataFrame} 반환.
+    워크시트는 최대 FETCH_MAX_WORKERS 개 묶음으로 나눠 묶음별 batchGet 을 병렬로 보낸다."""
+    try:
+        backend = source_backend()
+        names = backend.sheet_titles(sid, creds)
+        if not names:
+            return None
+        n_chunks = max(1, min(FETCH_MAX_WORKERS, len(names)))
+        size = -(-len(names) // n_chunks)
+        chunks = [names[i:i + size] for i in range(0, len(names), size)]
+
+        def get_chunk(titles):
+            with _fetch_slots():
+                ranges = ["'" + title.replace("'", "''") + "'" for title in titles]
+                resp = backend.batch_get_values(sid, ranges, creds)
+            return dict(zip(titles, resp.get("valueRanges", [])))
+
+        value_ranges = {}
+        for part, _ in _run_parallel({i: (lambda c=c: get_chunk(c)) for i, c in enumerate(chunks)}, len(chunks)).values():
+            value_ranges.update(part)
+        book = {}
+        for title in names:
+            rows = value_ranges.get(title, {}).get("values", [])
+            # 빈 셀("")과 짧은 행의 패딩(None)은 xlsx 로 읽을 때와 같게 NaN 으로
+            df = pd.DataFrame(rows)
+            book[title] = df.mask(df.isna() | (df == ""))
+        return book
+    except Exception:
+        return None
+
+@tracked_cache_data(ttl=SOURCE_CHECK_TTL, show_spinner=False)
+def get_source_version(sheet_id):
+    """Drive 파일 메타데이터로 스프레드시트 버전 문자열 반환 (내용 다운로드 없음). 실패 시 None."""
+    if not sheet_id:
+        return None
+    backend = source_backend()
+    creds = backend.credentials()
+    if not creds:
+        return None
+    try:
+        meta = backend.file_metadata(sheet_id, creds)
+        return f"{meta.get('version', '')}@{meta.get('modifiedTime', '')}"
+    except Exception:
+        return None
+
+def _source_version_token(sheet_id):
+    # 메타데이터를 못 읽으면 기존처럼 SOURCE_FALLBACK_TTL 단위로 새 버전 취급
+    return get_source_version(sheet_id) or f"ttl-{int(time.time() // SOURCE_FALLBACK_TTL)}"
+
+class SourceUnavailable(Exception):
+    """다운로드 실패. 예외는 st.cache_data 에 저장되지 않으므로 다음 호출에서 다시 시도한다."""
+
+# version 이 바뀔 때만 export 를 다시 받는다 (같은 version 이면 캐시된 바이트 재사용).
+# 반환값은 xlsx 바이트, 또는 export 실패 시 Sheets API 로 받은 {시트명: DataFrame} 을 감싼 SourceHandle (digest 는 받을 때 한 번).
+@tracked_cache_data(max_entries=8, flight="fetch")
+def fetch_sheet_bytes(sheet_id, version=None):
+    backend = source_backend()
+    creds = backend.credentials() if sheet_id else None
+    if not creds:
+        raise SourceUnavailable(sheet_id)
+    try:
+        with _fetch_slots():
+            return SourceHandle(backend.export_xlsx(sheet_id, creds))
+    except Exception:
+        pass
+    data = _fetch_sheet_via_api(sheet_id, creds)
+    if data is None:
+        raise SourceUnavailable(sheet_id)
+    return SourceHandle(data)
+
+def _fetch_source(sheet_id):
+    if not sheet_id:
+        return None
+    try:
+        return fetch_sheet_bytes(sheet_id, _source_version_token(sheet_id))
+    except SourceUnavailable:
+        return None
+
+def get_all_sources():
+    backend = source_backend()
+    if isinstance(backend, LocalFolderBackend):
+        with perf_timer("fetch.local"):
+            return backend.sources()
+    # 입출고/온라인 스프레드시트를 동시에 받아 전체 대기시간을 가장 느린 한 건 수준으로
+    sheet_ids = backend.sheet_ids()
+    results = _run_parallel({name: (lambda sid=sheet_ids.get(name): _fetch_source(sid)) for name in ("inout", "online")}, max_workers=2)
+    for name, (_, sec) in results.items():
+        perf_stats().record(f"fetch.{name}", sec, "run")
+    out = {"inout": (results["inout"][0], "inout")}
+    online_bytes = results["online"][0]
+    for brand_key in BRAND_KEY_TO_SHEET_NAME:
+        out[brand_key] = (online_bytes, brand_key)
+    return out
+
+# ---- 워크북 읽기 ----
+# 소스는 xlsx 바이트, 로컬 파일 핸들(LocalFile), {시트명: header=None DataFrame} (Sheets API 폴백) 중 하나,
+# 또는 그것을 감싼 SourceHandle. 로더는 모두 둘 다 받는다.
+def _source_data(src):
+    return src.data if isinstance(src, SourceHandle) else src
+
+def _source_stream(src):
+    src = _source_data(src)
+    return src.open() if isinstance(src, LocalFile) else BytesIO(src)
+
+@contextmanager
+def _workbook_reader(src):
+    """with 블록 안에서 (시트명 리스트, 시트명 → header=None 원본 DataFrame 함수). 나가면 파일(mmap)을 닫는다."""
+    src = _source_data(src)
+    if isinstance(src, dict):
+        yield list(src), lambda name: src[name]
+        return
+    with _source_stream(src) as fh, pd.ExcelFile(fh) as excel_file:
+        yield excel_file.sheet_names, lambda name: excel_file.parse(name, header=None)
+
+def _content_digest(src):
+    if isinstance(src, SourceHandle):
+        return src.digest
+    if isinstance(src, LocalFile):
+        return src.digest()
+    if isinstance(src, dict):
+        h = hashlib.sha256()
+        for name, df in src.items():
+            h.update(str(name).encode("utf-8"))
+            h.update(pd.util.hash_pandas_object(df.astype(str), index=True).values.tobytes())
+        return h.hexdigest()
+    return hashlib.sha256(src).hexdigest()
+
+# ---- 컬럼/헤더 탐지 ----
+def find_col(keys, df=None):
+    if df is None or df.empty:
+        return None
+    cols = list(df.columns)
+    for k in keys:
+        for c in cols:
+            if str(c).strip() == k:
+                return c
+    for k in keys:
+        for c in cols:
+            if k in str(c):
+                return c
+    return None
+
+def _norm(v):
+    return "".join(str(v).split()) if v is not None else ""
+
+def _col_idx(header_vals, key):
+    for i, v in enumerate(header_vals):
+        if key in _norm(v):
+            return i
+    return None
+
+def _promote_header_row(df_raw, row_idx):
+    """header=None 으로 읽은 원본에서 row_idx 행을 컬럼명으로 올림 (pd.read_excel(header=row_idx) 와 동일한 컬럼명/dtype)."""
+    names, counts = [], {}
+    for i, v in enumerate(df_raw.iloc[row_idx].tolist() if row_idx < len(df_raw) else []):
+        name = f"Unnamed: {i}" if pd.isna(v) else str(v)
+        cur = counts.get(name, 0)
+        while cur > 0:
+            counts[name] = cur + 1
+            name = f"{name}.{cur}"
+            cur = counts.get(name, 0)
+        counts[name] = cur + 1
+        names.append(name)
+    df = df_raw.iloc[row_idx + 1:].reset_index(drop=True).infer_objects()
+    df.columns = names if names else df.columns
+    return df
+
+def _find_register_header(df_raw):
+    for i in range(min(30, len(df_raw))):
+        row = df_raw.iloc[i].tolist()
+        norm = [_norm(v) for v in row]
+        if any("스타일코드" in v for v in norm) and any("공홈등록일" in v for v in norm):
+            return i, norm
+    return None, None
+
+# ---- 디스크 스냅샷 캐시 ----
+# 정규화가 끝난 DataFrame을 원본 바이트의 SHA-256 기준으로 디스크에 보관 (프로세스 재시작/TTL 만료 후에도 재파싱 없이 로드).
+# Parquet 우선, 혼합 타입 object 컬럼 등으로 Parquet 저장이 불가하면 pickle 로 저장. 용량 초과 시 오래 안 쓴 파일부터 삭제(LRU).
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", "").strip() or os.path.join(BASE_DIR, ".snapshots")
+SNAPSHOT_MAX_MB = float(os.environ.get("SNAPSHOT_MAX_MB", "").strip() or 512)
+SNAPSHOT_VERSION = 3  # 정규화 결과 형태가 바뀌면 올려서 기존 스냅샷 무효화
+_SNAPSHOT_EXTS = (".parquet", ".pkl")
+
+def _snapshot_key(kind, io_bytes, *params):
+    digest = _content_digest(io_bytes)
+    tag = hashlib.sha256(repr(params).encode("utf-8")).hexdigest()[:12]
+    return f"v{SNAPSHOT_VERSION}-{kind}-{digest[:40]}-{tag}"
+
+def _snapshot_read(key):
+    for ext in _SNAPSHOT_EXTS:
+        path = os.path.join(SNAPSHOT_DIR, key + ext)
+        if not os.path.isfile(path):
+            continue
+        try:
+            df = pd.read_parquet(path) if ext == ".parquet" else pd.read_pickle(path)
+            os.utime(path)  # LRU 기준 시각 갱신
+            return df
+        except Exception:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    return None
+
+def _snapshot_write(key, df):
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    except OSError:
+        return
+    tmp = os.path.join(SNAPSHOT_DIR, f"{key}.{os.getpid()}.tmp")
+    for ext in _SNAPSHOT_EXTS:
+        try:
+            if ext == ".parquet":
+                df.to_parquet(tmp)
+            else:
+                df.to_pickle(tmp)
+            os.replace(tmp, os.path.join(SNAPSHOT_DIR, key + ext))
+            break
+        except Exception:
+            continue
+    try:
+        os.remove(tmp)
+    except OSError:
+        pass
+    _snapshot_evict()
+
+def _snapshot_evict():
+    try:
+        entries = [e for e in os.scandir(SNAPSHOT_DIR) if e.is_file() and e.name.endswith(_SNAPSHOT_EXTS)]
+    except OSError:
+        return
+    entries = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in entries), reverse=True)
+    total, limit = 0, SNAPSHOT_MAX_MB * 1024 * 1024
+    for _, size, path in entries:
+        total += size
+        if total > limit:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def _snapshot_cached(kind, io_bytes, params, build):
+    """스냅샷이 있으면 로드, 없으면 build() 결과를 저장 후 반환.
+    빈 결과는 저장하지 않는다 (읽기 실패로 빈 프레임이 나온 경우 같은 digest 가 재시작 후에도 빈 값으로 굳지 않도록)."""
+    key = _snapshot_key(kind, io_bytes, *params)
+
+    def load():
+        df = _snapshot_read(key)
+        if df is None:
+            df = build()
+            if isinstance(df, pd.DataFrame) and not df.empty:
+                _snapshot_write(key, df)
+        return df
+    return refresh_coordinator().run("parse", key, load)
+
+# ---- BASE 입출고 ----
+# target_sheet_name: 지정 시 해당 워크시트 사용 (예: "물류입고스타일수"). 미지정 시 기존처럼 첫 번째 비-_ 시트 사용.
+# 요청한 시트 이름이 아니라 실제로 읽는 워크시트로 키를 만들어, 같은 시트로 풀리는 호출은 파싱/캐시를 함께 쓴다.
+# 원본 프레임은 팩트 테이블을 만들 때만 읽으므로 메모리에 캐시하지 않고 디스크 스냅샷에서만 재사용한다.
+def _base_sheet_name(sheet_names, target_sheet_name=None):
+    if target_sheet_name and str(target_sheet_name).strip() in sheet_names:
+        return str(target_sheet_name).strip()
+    sheet_candidates = [s for s in sheet_names if not str(s).startswith("_")]
+    return sheet_candidates[0] if sheet_candidates else (sheet_names[-1] if sheet_names else None)
+
+def base_source(io_bytes, target_sheet_name=None):
+    """입출고 소스 핸들에 실제로 읽을 워크시트를 붙여 반환 (target_sheet_name 미지정 시 핸들의 sheet 사용)."""
+    src = SourceHandle.of(io_bytes)
+    return src.with_sheet(_base_sheet_name(src.sheet_names(), target_sheet_name or src.sheet))
+
+@perf_timer("load_base_inout")
+def load_base_inout(io_bytes=None, _cache_key=None, target_sheet_name=None):
+    if io_bytes is None or len(io_bytes) == 0:
+        return pd.DataFrame()
+    src = base_source(io_bytes, target_sheet_name)
+    return _snapshot_cached("base", src, (src.sheet,), lambda: _parse_base_inout(src))
+
+def _parse_base_inout(src):
+    with _workbook_reader(src) as (sheet_names, read_sheet):
+        if not sheet_names or src.sheet is None:
+            return pd.DataFrame()
+        # 시트는 한 번만 읽고, 헤더 행 탐지(상위 20행)와 컬럼명 지정은 메모리 상의 원본으로 처리
+        df_raw = read_sheet(src.sheet)
+    kw = ["브랜드", "스타일", "최초입고일", "입고", "출고", "판매"]
+    best_row, best_score = None, 0
+    for i in range(min(20, len(df_raw))):
+        row = df_raw.iloc[i].astype(str)
+        score = sum(1 for cell in row if any(k in cell for k in kw))
+        if score > best_score:
+            best_score, best_row = score, i
+    df = _promote_header_row(df_raw, best_row if (best_row is not None and best_score > 0) else 0)
+    df.columns = [str(c).strip() for c in df.columns]
+    style_col = find_col(["스타일코드", "스타일"], df=df)
+    if style_col and style_col in df.columns:
+        prefix = df[style_col].astype(str).str.strip().str.lower().str.slice(0, 2)
+        df["브랜드"] = prefix.map({"sp": "스파오", "rm": "로엠", "mi": "미쏘", "wh": "후아유", "hp": "슈펜", "cv": "클라비스", "eb": "에블린", "nb": "뉴발란스", "nk": "뉴발란스키즈"})
+    return df
+
+
+
+# ---- 메모리 절약형 스키마 ----
+# 캐시에 오래 머무는 프레임은 반복되는 문자열(브랜드/시즌/스타일코드)을 category 로, 결측 없는 정수 금액은
+# 가장 작은 정수형으로 줄여 둔다. category 컬럼으로 groupby 할 때는 observed=True 로 관측된 값만 집계한다.
+def _narrow_amount(s):
+    """결측 없이 모두 정수인 금액은 정수형으로 다운캐스트 (합계는 pandas 가 int64 로 올려 계산)."""
+    if s.dtype.kind == "f" and len(s) and s.notna().all() and (s % 1 == 0).all() and (s.abs() < 2 ** 53).all():
+        return pd.to_numeric(s.astype("int64"), downcast="integer")
+    return s
+
+def compact_frame(df, categories=(), amounts=()):
+    return df.astype({c: "category" for c in categories if c in df.columns}).assign(**{c: _narrow_amount(df[c]) for c in amounts if c in df.columns})
+
+def frame_memory_bytes(df):
+    return int(df.memory_usage(deep=True).sum()) if isinstance(df, pd.DataFrame) else 0
+
+# ---- 스타일 팩트 테이블 ----
+# 입출고 원본 한 행 = 팩트 한 행. 브랜드/스타일/시즌 정규화, 입고·출고·판매 플래그, 금액, 최초입고일을
+# 소스 버전당 한 번만 계산해 두고 스타일 테이블·입출고 집계·KPI·최초입고일 맵이 모두 이 결과를 사용한다.
+FACT_AMOUNT_COLS = {
+    "_order_amt": ["발주액"],
+    "_in_amt": ["누적입고액", "입고액"],
+    "_out_amt": ["출고액"],
+    "_sale_amt": ["누적 판매액[외형매출]", "누적판매액", "판매액"],  # KPI 카드·스타일 테이블
+    "_inout_sale_amt": ["누적판매액", "판매액"],  # 입출고 표 (두 컬럼이 다 있으면 KPI 와 다른 지표)
+}
+
+def load_base_facts(io_bytes=None, _cache_key=None, target_sheet_name=None):
+    """입출고 팩트 테이블. 시트 미지정/"물류입고스타일수" 처럼 같은 워크시트로 풀리는 호출은 캐시 항목 하나를 함께 쓴다."""
+    if io_bytes is None or len(io_bytes) == 0:
+        return pd.DataFrame()
+    return _load_base_facts(base_source(io_bytes, target_sheet_name))
+
+@tracked_cache_data("load_base_facts", max_entries=CACHE_VERSIONS * 2)
+def _load_base_facts(src):
+    return _snapshot_cached("facts", src, (src.sheet,), lambda: _build_base_facts(load_base_inout(src)))
+
+def _build_base_facts(df):
+    if df.empty:
+        return pd.DataFrame()
+    style_col = find_col(["스타일코드", "스타일"], df=df)
+    brand_col = "브랜드" if "브랜드" in df.columns else None
+    if not style_col or not brand_col:
+        return pd.DataFrame()
+    season_col = find_col(["시즌", "season"], df=df)
+    first_in_col = find_col(["최초입고일", "입고일"], df=df)
+    in_qty_col = find_col(["입고량"], df=df)
+    order_qty_col = find_col(["발주 STY", "발주수", "발주량"], df=df)
+
+    def num(col):
+        return pd.to_numeric(df[col], errors="coerce").fillna(0) if col and col in df.columns else pd.Series(0, index=df.index)
+
+    facts = pd.DataFrame(index=df.index)
+    facts["_brand"] = df[brand_col].astype(str).str.strip()
+    facts["_style"] = df[style_col].astype(str).str.strip()
+    facts["_season"] = df[season_col].astype(str).str.strip() if season_col and season_col in df.columns else ""
+    facts["_season_code"] = season_codes(facts["_season"]) if season_col and season_col in df.columns else pd.Series(-1, index=df.index, dtype="int8")
+    for out_col, keys in FACT_AMOUNT_COLS.items():
+        facts[out_col] = num(find_col(keys, df=df))
+    # 최초입고일: 문자열/날짜는 to_datetime, 1~60000 범위 숫자는 엑셀 일련번호로 변환
+    if first_in_col and first_in_col in df.columns:
+        numeric = pd.to_numeric(df[first_in_col], errors="coerce")
+        excel_mask = numeric.between(1, 60000, inclusive="both")
+        first_in = pd.to_datetime(df[first_in_col], errors="coerce")
+        if excel_mask.any():
+            first_in.loc[excel_mask] = pd.to_datetime(numeric[excel_mask].astype(float), unit="d", origin="1899-12-30", errors="coerce")
+        facts["_first_in"] = first_in
+    else:
+        facts["_first_in"] = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    facts["_in"] = facts["_first_in"].notna() | (num(in_qty_col) > 0) | (facts["_in_amt"] > 0)
+    facts["_out"] = facts["_out_amt"] > 0
+    facts["_sale"] = facts["_sale_amt"] > 0
+    facts["_inout_sale"] = facts["_inout_sale_amt"] > 0
+    facts["_ordered"] = bool(order_qty_col)
+    return compact_frame(facts, categories=("_brand", "_style", "_season"), amounts=FACT_AMOUNT_COLS)
+
+@tracked_cache_data(max_entries=CACHE_VERSIONS)
+def _base_style_to_first_in_map(io_bytes=None, _cache_key=None):
+    """스타일코드(공백 제거) → 최초입고일(최솟값) Series."""
+    facts = load_base_facts(io_bytes, _cache_key=_cache_key or "inout")
+    if facts.empty:
+        return pd.Series(dtype="datetime64[ns]", name="_first_in")
+    df = facts[facts["_first_in"].notna()]
+    key = df["_style"].str.replace(" ", "", regex=False)
+    df, key = df[key.str.len() > 0], key[key.str.len() > 0]
+    return df.groupby(key)["_first_in"].min()
+
+def _norm_season(val):
+    if val is None or pd.isna(val):
+        return ""
+    try:
+        v = int(val)
+        if 1900 <= v <= 2100:
+            return ""
+        return str(v) if -100 < v < 100 else ""
+    except Exception:
+        pass
+    s = str(val).strip().replace("시즌", "").replace(" ", "").strip()
+    if s.endswith(".0") and len(s) >= 2 and s[:-2].replace("-", "").isdigit():
+        return s[0] if s[0] != "-" else (s[1] if len(s) > 2 else "")
+    if not s or (s.isdigit() and len(s) >= 3):
+        return ""
+    s = s.upper()
+    return s[1] if len(s) >= 2 and s[0].isalpha() else s[0]
+
+# ---- 시즌 코드 ----
+# 시즌 값은 로드 시 SEASON_OPTIONS 인덱스(int8, 해당 없음 -1)로 한 번만 정규화하고 필터는 정수 코드 isin 으로 처리한다.
+# 판정 규칙은 고유값에만 적용하며, 필터 옵션끼리는 겹치지 않으므로 값마다 일치하는 옵션은 많아야 하나다.
+def _style_season_match(s, sel):
+    """스타일/입출고 시즌 규칙 (기존 _season_matches 와 동일)."""
+    s = s.str.strip()
+    return (s == sel) | (s.str.startswith(sel) & (s.str.len() == len(sel) | ~s.str.slice(len(sel), len(sel) + 1).str.isalnum().fillna(True)))
+
+def _register_season_match(s, sel):
+    """등록 시트 시즌 규칙: _norm_season 이 같고 원문이 ^G?{시즌}$ 형태."""
+    norm = _norm_season(sel)
+    if not norm:
+        return pd.Series(False, index=s.index)
+    return (s.map(_norm_season) == norm) & s.str.strip().str.upper().str.match(f"^G?{norm}$", na=False)
+
+def season_codes(season_series, match=_style_season_match):
+    cat = pd.Categorical(season_series.astype(str))
+    uniq = pd.Series(cat.categories, dtype=object)
+    lut = pd.Series(-1, index=uniq.index, dtype="int8")
+    for i, opt in enumerate(SEASON_OPTIONS):
+        lut[(lut < 0) & match(uniq, opt)] = i
+    return pd.Series(lut.to_numpy()[cat.codes], index=season_series.index, dtype="int8")
+
+def season_filter_codes(selected):
+    return [SEASON_OPTIONS.index(s) for s in selected if s in SEASON_OPTIONS]
+
+# ---- 온라인 워크북 레지스트리 ----
+# 온라인 스프레드시트는 브랜드별 워크시트(BRAND_KEY_TO_SHEET_NAME)를 한 파일에 담고 있으므로
+# 데이터 버전(바이트)당 한 번만 파싱하고, 브랜드 로더들은 여기서 자기 시트만 꺼내 쓴다.
+@cache_resource(max_entries=CACHE_VERSIONS * N_SOURCES, show_spinner=False)
+def load_online_workbook(io_bytes=None):
+    """{시트명: header=None 원본 DataFrame}. 세션 간 공유 객체이므로 호출측에서 수정하지 말 것."""
+    if io_bytes is None or len(io_bytes) == 0:
+        return {}
+    data = _source_data(io_bytes)
+    if isinstance(data, dict):  # Sheets API 폴백으로 받은 워크북
+        return data
+    try:
+        with _source_stream(data) as fh:
+            return pd.read_excel(fh, sheet_name=None, header=None)
+    except Exception:
+        SOURCE_LOGGER.exception("온라인 워크북 읽기 실패 (%r)", io_bytes)
+        return {}
+
+def _register_raw_sheets(io_bytes, target_sheet_name=None):
+    """target_sheet_name 지정 시 해당 시트만, 미지정 시 전체 시트를 원본 DataFrame 리스트로 반환."""
+    book = load_online_workbook(io_bytes)
+    if target_sheet_name:
+        if target_sheet_name in book:
+            return [book[target_sheet_name]]
+        # 로컬 브랜드별 파일은 워크시트 이름이 브랜드명이 아닐 수 있음 → 브랜드 워크시트가 하나도 없으면 전체 시트
+        return [] if any(name in book for name in BRAND_KEY_TO_SHEET_NAME.values()) else list(book.values())
+    return list(book.values())
+
+# ---- 브랜드 등록 시트 ----
+# 등록 시트는 스타일코드/시즌/등록여부/공홈등록일/포토인계일/리터칭완료일로 정규화해 두고
+# 등록여부 테이블과 평균 소요일 계산이 이 결과를 함께 사용한다. 시즌 컬럼이 없는 시트는 시즌=None.
+@tracked_cache_data(max_entries=CACHE_VERSIONS * N_SOURCES)
+def load_brand_register_frame(io_bytes=None, _cache_key=None, target_sheet_name=None):
+    if io_bytes is None or len(io_bytes) == 0:
+        return pd.DataFrame()
+    return _snapshot_cached("register", io_bytes, (target_sheet_name,), lambda: _parse_register_frame(io_bytes, target_sheet_name))
+
+def _parse_register_frame(io_bytes, target_sheet_name=None):
+    for df_raw in _register_raw_sheets(io_bytes, target_sheet_name):
+        if df_raw is None or df_raw.empty:
+            continue
+        header_row_idx, header_vals = _find_register_header(df_raw)
+        if header_row_idx is None:
+            continue
+        style_col = _col_idx(header_vals, "스타일코드") or _col_idx(header_vals, "스타일")
+        regdate_col = _col_idx(header_vals, "공홈등록일")
+        season_col = _col_idx(header_vals, "시즌")
+        if style_col is None or regdate_col is None:
+            continue
+        data = df_raw.iloc[header_row_idx + 1:]
+
+        def date_col(key):
+            i = _col_idx(header_vals, key)
+            return _parse_date_series(data.iloc[:, i]) if i is not None and i < data.shape[1] else pd.Series(pd.NaT, index=data.index, dtype="datetime64[ns]")
+
+        out = pd.DataFrame(index=data.index)
+        out["스타일코드"] = data.iloc[:, style_col].astype(str).str.strip()
+        out["시즌"] = data.iloc[:, season_col].astype(str).str.strip() if season_col is not None and season_col < data.shape[1] else None
+        out["_season_code"] = season_codes(out["시즌"], _register_season_match) if out["시즌"].notna().any() else pd.Series(-1, index=out.index, dtype="int8")
+        out["등록여부"] = pd.to_datetime(data.iloc[:, regdate_col], errors="coerce").notna()
+        out["공홈등록일"] = date_col("공홈등록일")
+        out["포토인계일"] = date_col("포토인계일")
+        out["리터칭완료일"] = date_col("리터칭완료일")
+        out = out[out["스타일코드"].str.len() > 0]
+        return compact_frame(out[out["스타일코드"] != "nan"], categories=("시즌",))
+    return pd.DataFrame()
+
+@tracked_cache_data(max_entries=CACHE_VERSIONS * N_SOURCES)
+def load_brand_register_df(io_bytes=None, _cache_key=None, target_sheet_name=None):
+    frame = load_brand_register_frame(io_bytes, _cache_key=_cache_key, target_sheet_name=target_sheet_name)
+    if frame.empty:
+        return pd.DataFrame()
+    out = pd.DataFrame(index=frame.index)
+    out["스타일코드"] = frame["스타일코드"]
+    out["시즌"] = frame["시즌"].astype(object).fillna("")
+    out["온라인상품등록여부"] = frame["등록여부"].map({True: "등록", False: "미등록"})
+    return out
+
+def _parse_date_series(col_series):
+    """컬럼 시리즈를 날짜 시리즈로 변환 (엑셀 숫자일 포함)."""
+    s = col_series.replace(0, pd.NA).replace("0", pd.NA)
+    numeric = pd.to_numeric(s, errors="coerce")
+    excel_mask = numeric.between(1, 60000, inclusive="both")
+    dt = pd.to_datetime(s, errors="coerce")
+    if excel_mask.any():
+        dt = dt.copy()
+        dt.loc[excel_mask] = pd.to_datetime(numeric[excel_mask].astype(float), unit="d", origin="1899-12-30", errors="coerce")
+    return dt
+
+
+# 단계별 (시작일 컬럼, 종료일 컬럼). 종료일 - 시작일 일수를 0 이상으로 잘라서 집계
+LEAD_TIME_STAGES = {
+    "평균전체등록소요일수": ("_first_in", "공홈등록일"),
+    "포토인계소요일수": ("_first_in", "포토인계일"),
+    "포토소요일수": ("포토인계일", "리터칭완료일"),
+    "상품등록소요일수": ("리터칭완료일", "공홈등록일"),
+}
+
+def _lead_time_stats(days):
+    if days.empty:
+        return {"count": 0, "mean": None, "median": None, "p90": None, "max": None}
+    return {"count": int(days.size), "mean": float(days.mean()), "median": float(days.median()), "p90": float(days.quantile(0.9)), "max": int(days.max())}
+
+def _lead_time_rows(reg_bytes, inout_bytes, _cache_key=None, _inout_cache_key=None, selected_seasons_tuple=None, target_sheet_name=None):
+    """등록일이 있는 등록 시트 행 + 최초입고일(_first_in). 시즌 필터 적용. 없으면 None."""
+    if not reg_bytes or len(reg_bytes) == 0:
+        return None
+    first_in = _base_style_to_first_in_map(inout_bytes, _inout_cache_key or "inout") if inout_bytes else None
+    if first_in is None or first_in.empty:
+        return None
+    data = load_brand_register_frame(reg_bytes, _cache_key=_cache_key, target_sheet_name=target_sheet_name)
+    if data.empty:
+        return None
+    if selected_seasons_tuple and data["시즌"].notna().any():
+        codes = season_filter_codes(selected_seasons_tuple)
+        if codes:
+            data = data[data["_season_code"].isin(codes)]
+    if data.empty:
+        return None
+    # 등록일이 있는 행만 최초입고일 테이블과 한 번에 조인
+    data = data[data["공홈등록일"].notna()]
+    data = data.assign(_style=data["스타일코드"].str.replace(r"\s+", "", regex=True))
+    return data.join(first_in.rename("_first_in"), on="_style", how="inner")
+
+def _stage_days(merged):
+    """단계 → 종료일 - 시작일 일수 (음수 포함, 결측 제외)."""
+    return {key: (merged[end_col] - merged[start_col]).dropna().dt.days for key, (start_col, end_col) in LEAD_TIME_STAGES.items()}
+
+@tracked_cache_data(max_entries=CACHE_VERSIONS * N_SOURCES * 16)  # 브랜드 × 시즌 선택 조합
+def load_brand_register_avg_days(reg_bytes=None, inout_bytes=None, _cache_key=None, _inout_cache_key=None, selected_seasons_tuple=None, target_sheet_name=None):
+    """브랜드별 평균 소요일수 반환. dict 키: 평균전체등록소요일수, 포토인계소요일수, 포토소요일수, 상품등록소요일수.
+    "stats" 키에는 단계별 count/mean/median/p90/max 가 들어 있다."""
+    merged = _lead_time_rows(reg_bytes, inout_bytes, _cache_key, _inout_cache_key, selected_seasons_tuple, target_sheet_name)
+    if merged is None:
+        return None
+    stats = {key: _lead_time_stats(days.clip(lower=0)) for key, days in _stage_days(merged).items()}
+    result = {key: v["mean"] for key, v in stats.items()}
+    result["stats"] = stats
+    return result
+
+def brand_lead_times(sources, brand_name, selected_seasons_tuple=None):
+    """브랜드명으로 등록 시트 소스를 찾아 load_brand_register_avg_days 결과 반환. 등록 시트가 없는 브랜드는 None."""
+    brand_key = BRAND_TO_KEY.get(brand_name)
+    if brand_name in NO_REG_SHEET_BRANDS or not brand_key:
+        return None
+    reg_bytes = sources.get(brand_key, (None, None))[0]
+    if not reg_bytes:
+        return None
+    base_bytes = sources.get("inout", (None, None))[0]
+    return load_brand_register_avg_days(reg_bytes, base_bytes, _cache_key=brand_key, _inout_cache_key="inout", selected_seasons_tuple=selected_seasons_tuple, target_sheet_name=BRAND_KEY_TO_SHEET_NAME.get(brand_key))
+
+# ---- 스타일 테이블 / 입출고 집계 ----
+REGISTER_DATE_COLS = ["공홈등록일", "포토인계일", "리터칭완료일"]
+
+@tracked_cache_data(max_entries=CACHE_VERSIONS)
+def build_style_table_all(sources):
+    """브랜드·스타일 단위 팩트 테이블: 시즌, 입고/출고 여부, 금액 합계, 최초입고일, 온라인 등록여부와 등록/포토인계/리터칭완료일."""
+    base_bytes = sources.get("inout", (None, None))[0]
+    # 물류입고스타일수: base 스프레드시트의 "물류입고스타일수" 워크시트 사용
+    facts = load_base_facts(base_bytes, _cache_key="inout_물류", target_sheet_name="물류입고스타일수")
+    if facts.empty and base_bytes:
+        facts = load_base_facts(base_bytes, _cache_key="inout", target_sheet_name=None)
+    if facts.empty:
+        return pd.DataFrame()
+    facts = facts[facts["_style"].str.len() > 0]
+    keys = ["_brand", "_style"]
+    g = facts.groupby(keys, observed=True)
+    style_df = g.agg(
+        입고여부=("_in", "any"), 출고여부=("_out", "any"),
+        발주액=("_order_amt", "sum"), 입고액=("_in_amt", "sum"), 출고액=("_out_amt", "sum"), 판매액=("_sale_amt", "sum"),
+        최초입고일=("_first_in", "min"),
+    )
+    # 시즌: 입고된 행 중 첫 번째 시즌
+    style_df["시즌"] = facts[facts["_in"]].groupby(keys, observed=True)["_season"].first().astype(object).reindex(style_df.index).fillna("")
+    style_df["_season_code"] = season_codes(style_df["시즌"])
+    style_df = style_df.reset_index().rename(columns={"_brand": "브랜드", "_style": "스타일코드"}).astype({"브랜드": object, "스타일코드": object})
+
+    reg_parts = []
+    for brand_name in style_df["브랜드"].unique().tolist():
+        brand_key = BRAND_TO_KEY.get(brand_name)
+        if not brand_key:
+            continue
+        reg_bytes = sources.get(brand_key, (None, None))[0]
+        frame = load_brand_register_frame(reg_bytes, _cache_key=brand_key, target_sheet_name=BRAND_KEY_TO_SHEET_NAME.get(brand_key))
+        if not frame.empty:
+            part = frame[["스타일코드", "등록여부"] + REGISTER_DATE_COLS].drop_duplicates("스타일코드")
+            reg_parts.append(part.assign(브랜드=brand_name))
+    if reg_parts:
+        style_df = style_df.merge(pd.concat(reg_parts, ignore_index=True), on=["브랜드", "스타일코드"], how="left")
+    else:
+        style_df = style_df.assign(등록여부=False, **{c: pd.NaT for c in REGISTER_DATE_COLS})
+    style_df["온라인상품등록여부"] = style_df["등록여부"].eq(True)
+    style_df["입고 여부"] = style_df["입고여부"].astype(bool)
+    style_df["출고 여부"] = style_df["출고여부"].astype(bool)
+    cols = ["브랜드", "스타일코드", "시즌", "입고 여부", "출고 여부", "온라인상품등록여부", "발주액", "입고액", "출고액", "판매액", "최초입고일"] + REGISTER_DATE_COLS + ["_season_code"]
+    return compact_frame(style_df[cols], categories=("브랜드", "스타일코드", "시즌"), amounts=("발주액", "입고액", "출고액", "판매액"))
+
+INOUT_CUBE_AGG = {
+    "발주 STY수": ("_style", "nunique"), "발주액": ("_order_amt", "sum"),
+    "입고 STY수": ("_in_style", "nunique"), "입고액": ("_in_amt", "sum"),
+    "출고 STY수": ("_out_style", "nunique"), "출고액": ("_out_amt", "sum"),
+    "판매 STY수": ("_sale_style", "nunique"), "판매액": ("_sale_amt", "sum"),
+}
+
+def _inout_cube_frame(df):
+    """INOUT_CUBE_AGG 로 집계할 팩트 프레임. 플래그가 꺼진 행은 스타일/금액을 비워 두고 한 번의 groupby 로 집계한다."""
+    return pd.DataFrame({
+        "_brand": df["_brand"], "_season": df["_season"], "_style": df["_style"],
+        "_in_style": df["_style"].where(df["_in"]), "_out_style": df["_style"].where(df["_out"]), "_sale_style": df["_style"].where(df["_inout_sale"]),
+        "_order_amt": df["_order_amt"], "_in_amt": df["_in_amt"].where(df["_in"], 0), "_out_amt": df["_out_amt"].where(df["_out"], 0), "_sale_amt": df["_inout_sale_amt"],
+    })
+
+@tracked_cache_data(max_entries=CACHE_VERSIONS)
+def build_inout_cube(io_bytes):
+    """브랜드×시즌 입출고 큐브. 시즌=None 행은 브랜드 합계 (고유 스타일 수는 시즌 합이 아니라 브랜드 전체 기준)."""
+    df = load_base_facts(io_bytes, _cache_key="base")
+    if df.empty:
+        return pd.DataFrame()
+    f = _inout_cube_frame(df)
+    by_season = f.groupby(["_brand", "_season"], observed=True).agg(**INOUT_CUBE_AGG).reset_index().astype({"_brand": object, "_season": object})
+    by_brand = f.groupby("_brand", observed=True).agg(**INOUT_CUBE_AGG).reset_index().astype({"_brand": object}).assign(_season=None)
+    if not df["_ordered"].any():
+        by_brand["발주 STY수"] = 0
+    cube = pd.concat([by_season, by_brand], ignore_index=True)
+    return cube.rename(columns={"_brand": "브랜드", "_season": "시즌"})
+
+@tracked_cache_data(max_entries=CACHE_VERSIONS)
+def build_inout_aggregates(io_bytes):
+    cube = build_inout_cube(io_bytes)
+    if cube.empty:
+        return [], {}, pd.DataFrame()
+    totals = cube[cube["시즌"].isna()].set_index("브랜드")
+    brand_season_df = cube[cube["시즌"].notna()].reset_index(drop=True)
+
+    def fmt_num(v):
+        return f"{int(v):,}" if pd.notna(v) and v != "" else "0"
+    def fmt_eok(v):
+        try:
+            return f"{float(v) / 1e8:,.0f} 억 원"
+        except Exception:
+            return "0 억 원"
+
+    def total(b, c):
+        return totals.at[b, c] if b in totals.index else 0
+
+    rows = [{"브랜드": b, **{c: (fmt_eok if "액" in c else fmt_num)(total(b, c)) for c in INOUT_CUBE_AGG}} for _, bu_brands in bu_groups for b in bu_brands]
+    agg = {key: {b: int(v) for b, v in totals[col].items() if v > 0} for key, col in [("brand_in_qty", "입고 STY수"), ("brand_out_qty", "출고 STY수"), ("brand_sale_qty", "판매 STY수")]}
+    return rows, agg, brand_season_df
+
+# ---- 상품등록 모니터링 표 ----
+LEAD_TIME_DISPLAY_COLS = {"평균전체등록소요일수": "평균전체등록소요일수", "포토인계소요일수": "포토인계소요일수", "포토소요일수": "포토 소요일수", "상품등록소요일수": "상품등록소요일수"}
+
+@perf_timer("build_monitor_table")
+def build_monitor_table(sources, selected_seasons=None):
+    """브랜드별 물류입고/온라인등록 스타일수, 등록율, 단계별 평균 소요일. 물류입고스타일수 내림차순.
+    등록 시트가 없는 브랜드는 온라인등록스타일수/온라인등록율 = -1."""
+    df_style_all = build_style_table_all(sources)
+    if df_style_all.empty:
+        return pd.DataFrame()
+    df_for_table = df_style_all
+    if selected_seasons and set(selected_seasons) != set(SEASON_OPTIONS):
+        df_for_table = df_for_table[df_for_table["_season_code"].isin(season_filter_codes(selected_seasons))]
+    df_style_unique = df_for_table.drop_duplicates(subset=["브랜드", "시즌", "스타일코드"])
+    df_in = df_style_unique[df_style_unique["입고 여부"]]
+    table_df = pd.DataFrame({"브랜드": sorted(df_style_all["브랜드"].unique())})
+    # 물류입고스타일수: base 스프레드시트 "물류입고스타일수" 시트 기준 (df_in은 이미 해당 시트에서 생성됨)
+    table_df["물류입고스타일수"] = table_df["브랜드"].map(df_in.groupby("브랜드", observed=True)["스타일코드"].nunique()).fillna(0).astype(int)
+    table_df["온라인등록스타일수"] = table_df["브랜드"].map(df_in[df_in["온라인상품등록여부"]].groupby("브랜드", observed=True)["스타일코드"].nunique()).fillna(0).astype(int)
+    # 온라인등록율 = 브랜드별 (온라인등록스타일수 / 온라인입고스타일수), 단위 %
+    denom = table_df["물류입고스타일수"].replace(0, pd.NA)
+    table_df["온라인등록율"] = (table_df["온라인등록스타일수"] / denom).fillna(0).round(2)
+    table_df["전체 미등록스타일"] = table_df["물류입고스타일수"] - table_df["온라인등록스타일수"]
+    table_df["등록수"] = table_df["온라인등록스타일수"]
+    for col in LEAD_TIME_DISPLAY_COLS.values():
+        table_df[col] = "-"
+    table_df["미분배(분배팀)"] = "-"
+    season_tuple = tuple(selected_seasons) if selected_seasons else None
+    for brand_name in table_df["브랜드"].unique():
+        avg_days = brand_lead_times(sources, brand_name, season_tuple)
+        if avg_days is not None:
+            for key, col in LEAD_TIME_DISPLAY_COLS.items():
+                v = avg_days.get(key)
+                if v is not None:
+                    table_df.loc[table_df["브랜드"] == brand_name, col] = f"{v:.1f}"
+    for b in NO_REG_SHEET_BRANDS:
+        if b in table_df["브랜드"].values:
+            table_df.loc[table_df["브랜드"] == b, "온라인등록스타일수"] = -1
+            table_df.loc[table_df["브랜드"] == b, "온라인등록율"] = -1.0
+    table_df["_등록율"] = table_df.apply(lambda r: "-" if r["브랜드"] in NO_REG_SHEET_BRANDS else str(int(r["온라인등록율"] * 100) if r["온라인등록율"] >= 0 else 0) + "%", axis=1)
+    return table_df.sort_values("물류입고스타일수", ascending=False).reset_index(drop=True)
+
+def build_lead_time_table(sources, selected_seasons=None):
+    """브랜드 × 단계별 리드타임 통계(count/mean/median/p90/max) 긴 형식 표."""
+    season_tuple = tuple(selected_seasons) if selected_seasons else None
+    rows = []
+    for brand_name in BRAND_TO_KEY:
+        avg_days = brand_lead_times(sources, brand_name, season_tuple)
+        for stage, stats in ((avg_days or {}).get("stats") or {}).items():
+            rows.append({"브랜드": brand_name, "단계": stage, **stats})
+    return pd.DataFrame(rows)
+
+# ---- 리드타임 분포 ----
+# 평균만으로는 긴 꼬리가 보이지 않으므로 브랜드 × 단계별 백분위와 고정 구간 히스토그램을 함께 만든다.
+# 평균·백분위는 평균 소요일과 같은 기준(음수 = 0일), 음수 행(입력 오류)은 건수를 따로 세고 히스토그램에서도 별도 구간으로 둔다.
+LEAD_TIME_BUCKETS = [0, 1, 3, 5, 7, 14, 21, 30, 60, 90, np.inf]  # 일수 구간 [a, b)
+LEAD_TIME_BUCKET_LABELS = ["0", "1-2", "3-4", "5-6", "7-13", "14-20", "21-29", "30-59", "60-89", "90+"]
+LEAD_TIME_NEGATIVE_BUCKET = "음수"
+LEAD_TIME_PERCENTILES = (0.1, 0.25, 0.5, 0.75, 0.9, 0.95)
+
+@tracked_cache_data(max_entries=CACHE_VERSIONS * 32)
+def lead_time_distribution(sources, selected_seasons_tuple=None):
+    """(요약, 히스토그램). 요약: 브랜드·단계별 건수/음수/평균/p10~p95/최대.
+    히스토그램: 브랜드·단계·구간(음수 + LEAD_TIME_BUCKET_LABELS)별 건수. 데이터 버전(소스 digest)과 시즌 선택으로 캐시."""
+    parts = []
+    for brand_name, brand_key in BRAND_TO_KEY.items():
+        if brand_name in NO_REG_SHEET_BRANDS:
+            continue
+        merged = _lead_time_rows(sources.get(brand_key, (None, None))[0], sources.get("inout", (None, None))[0], brand_key, "inout", selected_seasons_tuple, BRAND_KEY_TO_SHEET_NAME.get(brand_key))
+        if merged is None:
+            continue
+        for stage, days in _stage_days(merged).items():
+            parts.append(pd.DataFrame({"브랜드": brand_name, "단계": stage, "일수": days.to_numpy()}))
+    buckets = [LEAD_TIME_NEGATIVE_BUCKET] + LEAD_TIME_BUCKET_LABELS
+    if not parts:
+        return pd.DataFrame(), pd.DataFrame(columns=["브랜드", "단계", "구간", "건수"])
+    long = pd.concat(parts, ignore_index=True)
+    long["단계"] = pd.Categorical(long["단계"], categories=list(LEAD_TIME_STAGES))
+    negative = long["일수"] < 0
+    days = long["일수"].clip(lower=0)
+    g = long.assign(_days=days, _neg=negative).groupby(["브랜드", "단계"], observed=True)
+    summary = g.agg(건수=("_days", "size"), 음수=("_neg", "sum"), 평균=("_days", "mean"), 최대=("_days", "max"))
+    pct = g["_days"].quantile(list(LEAD_TIME_PERCENTILES)).unstack()
+    pct.columns = [f"p{round(q * 100)}" for q in pct.columns]
+    summary = summary.join(pct).reset_index().astype({"단계": object})
+    bucket = pd.Series(pd.cut(days, bins=LEAD_TIME_BUCKETS, right=False, labels=LEAD_TIME_BUCKET_LABELS).astype(object), index=long.index).mask(negative, LEAD_TIME_NEGATIVE_BUCKET)
+    hist = (long.assign(구간=pd.Categorical(bucket, categories=buckets)).groupby(["브랜드", "단계", "구간"], observed=False).size()
+            .rename("건수").reset_index())
+    # 관측된 (브랜드, 단계) 만 남기고 그 안에서는 빈 구간도 0 으로 유지 (차트 축 고정)
+    hist = hist.merge(summary[["브랜드", "단계"]], on=["브랜드", "단계"]).astype({"단계": object, "구간": object})
+    return summary, hist
+
+# ---- 스타일 드릴다운 ----
+# 브랜드 합계 뒤의 개별 스타일(특히 미등록)을 보는 표. 필터·정렬·페이지 자르기는 모두 서버에서 하고 화면에는 한 페이지만 보낸다.
+DRILLDOWN_LEAD_COLS = {"포토인계소요일수": "포토인계소요일수", "포토소요일수": "포토소요일수", "상품등록소요일수": "상품등록소요일수", "평균전체등록소요일수": "전체등록소요일수"}
+DRILLDOWN_STATUSES = ["미등록", "등록", "미입고", "등록시트없음"]
+
+@tracked_cache_data(max_entries=CACHE_VERSIONS)
+def build_style_drilldown(sources):
+    """스타일 단위 표: 브랜드, 스타일코드, 시즌, 입고/출고, 등록상태, 단계별 일자와 소요일.
+    등록상태: 등록 / 미등록(입고됐으나 미등록 = 전체 미등록스타일) / 미입고 / 등록시트없음."""
+    df = build_style_table_all(sources)
+    if df.empty:
+        return pd.DataFrame()
+    registered, stocked = df["온라인상품등록여부"].to_numpy(), df["입고 여부"].to_numpy()
+    no_sheet = df["브랜드"].isin(NO_REG_SHEET_BRANDS).to_numpy()
+    status = np.select([no_sheet, registered, stocked], ["등록시트없음", "등록", "미등록"], "미입고")
+    out = pd.DataFrame({
+        "브랜드": df["브랜드"], "스타일코드": df["스타일코드"], "시즌": df["시즌"],
+        "입고": df["입고 여부"], "출고": df["출고 여부"], "등록상태": pd.Categorical(status, categories=DRILLDOWN_STATUSES),
+        "최초입고일": df["최초입고일"], **{c: df[c] for c in REGISTER_DATE_COLS},
+    })
+    dates = {"_first_in": df["최초입고일"], **{c: df[c] for c in REGISTER_DATE_COLS}}
+    for key, col in DRILLDOWN_LEAD_COLS.items():
+        start_col, end_col = LEAD_TIME_STAGES[key]
+        out[col] = (dates[end_col] - dates[start_col]).dt.days.clip(lower=0).astype("Int32")
+    out["_season_code"] = df["_season_code"]
+    return out
+
+@tracked_cache_data(max_entries=32, show_spinner=False)
+def style_drilldown_order(version, brands=(), season_codes=(), statuses=(), search="", sort_by=None, descending=False, _sources=None):
+    """필터·정렬을 적용한 행 위치(int32) 배열. 같은 조건의 페이지 넘김은 이 배열을 자르기만 한다.
+    version 은 데이터 버전 id (_sources 는 캐시 키에서 제외)."""
+    df = build_style_drilldown(_sources)
+    if df.empty:
+        return np.empty(0, dtype="int32")
+    mask = np.ones(len(df), dtype=bool)
+    if brands:
+        mask &= df["브랜드"].isin(brands).to_numpy()
+    if season_codes:
+        mask &= df["_season_code"].isin(season_codes).to_numpy()
+    if statuses:
+        mask &= df["등록상태"].isin(statuses).to_numpy()
+    if search:
+        # 스타일코드는 범주형 → 고유값(범주)에서만 검색하고 코드로 행을 고른다
+        style = df["스타일코드"].astype("category")
+        hit = np.flatnonzero(style.cat.categories.astype(str).str.contains(search.strip(), case=False, regex=False))
+        mask &= np.isin(style.cat.codes.to_numpy(), hit)
+    positions = np.flatnonzero(mask)
+    if sort_by and sort_by in df.columns and len(positions):
+        keys = df[sort_by].iloc[positions].reset_index(drop=True)
+        positions = positions[keys.sort_values(ascending=not descending, kind="stable", na_position="last").index.to_numpy()]
+    return positions.astype("int32")
+
+def style_drilldown_page(df, positions, page, page_size):
+    """page(0부터) 한 쪽 분량의 행만 잘라 반환 (내부 컬럼 제외)."""
+    rows = positions[page * page_size:(page + 1) * page_size]
+    return df.iloc[rows].drop(columns=["_season_code"]).reset_index(drop=True)
+
+def cache_memory_report(sources):
+    """캐시에 상주하는 주요 프레임별 행 수와 메모리 사용량(MB, deep)."""
+    base_bytes = sources.get("inout", (None, None))[0]
+    frames = {
+        "입출고 팩트": load_base_facts(base_bytes, _cache_key="base"),
+        "입출고 팩트 (물류입고스타일수)": load_base_facts(base_bytes, _cache_key="inout_물류", target_sheet_name="물류입고스타일수"),
+        "스타일 테이블": build_style_table_all(sources),
+        "스타일 드릴다운": build_style_drilldown(sources),
+        "입출고 큐브": build_inout_cube(base_bytes),
+    }
+    for brand_key, sheet_name in BRAND_KEY_TO_SHEET_NAME.items():
+        frames[f"등록 시트 ({sheet_name})"] = load_brand_register_frame(sources.get(brand_key, (None, None))[0], _cache_key=brand_key, target_sheet_name=sheet_name)
+    return pd.DataFrame([{"프레임": name, "행 수": len(df), "메모리(MB)": round(frame_memory_bytes(df) / 2 ** 20, 2)} for name, df in frames.items()])
+
+# ---- 이력 저장소 ----
+# 데이터 버전이 바뀔 때마다 브랜드×시즌 단위 요약 행(모니터링 표 지표, 입출고 큐브)을 SQLite 에 덧붙인다.
+# 추이 화면은 이 요약만 읽으므로 지난 워크북을 다시 파싱하지 않는다. 버전별로 한 번만 기록 (재시작해도 중복 없음).
+HISTORY_DB = os.environ.get("HISTORY_DB", "").strip() or os.path.join(BASE_DIR, ".history", "history.sqlite")
+HISTORY_RETENTION_DAYS = int(read_secret("HISTORY_RETENTION_DAYS") or os.environ.get("HISTORY_RETENTION_DAYS", "").strip() or 730)  # 0 이면 삭제 안 함
+HISTORY_ALL_SEASONS = "전체"  # 시즌 필터 없음(모니터링 표 기본 화면) / 큐브의 브랜드 합계 행
+HISTORY_TABLES = {
+    "monitor_history": ["물류입고스타일수", "온라인등록스타일수", "온라인등록율", *LEAD_TIME_DISPLAY_COLS.values()],
+    "inout_history": list(INOUT_CUBE_AGG),
+}
+HISTORY_METRICS = {col: table for table, cols in HISTORY_TABLES.items() for col in cols}
+HISTORY_LOGGER = logging.getLogger("onlinedash.history")
+
+def history_rows(sources):
+    """{테이블: 요약 DataFrame}. 모니터링 지표는 시즌 전체 + 시즌별, 등록 시트 없는 브랜드의 등록 지표는 NaN.
+    입출고 지표의 시즌은 화면 시즌 필터·KPI 와 같은 시즌 코드(_season_code)의 SEASON_OPTIONS 값 ("1 " → "1").
+    필터가 고르지 못하는 시즌 값("G1", "2시즌" 등)은 브랜드 합계(전체)에만 들어간다."""
+    monitor_parts = []
+    for season in [HISTORY_ALL_SEASONS] + SEASON_OPTIONS:
+        table_df = build_monitor_table(sources, SEASON_OPTIONS if season == HISTORY_ALL_SEASONS else [season])
+        if table_df.empty:
+            continue
+        part = table_df[["브랜드"]].assign(시즌=season)
+        for col in HISTORY_TABLES["monitor_history"]:
+            part[col] = pd.to_numeric(table_df[col], errors="coerce")  # 소요일 "-" → NaN
+        no_sheet = part["브랜드"].isin(NO_REG_SHEET_BRANDS)
+        part.loc[no_sheet, ["온라인등록스타일수", "온라인등록율"]] = np.nan
+        monitor_parts.append(part)
+    base_bytes = sources.get("inout", (None, None))[0]
+    cube = build_inout_cube(base_bytes)
+    if not cube.empty:
+        facts = load_base_facts(base_bytes, _cache_key="base")
+        f = _inout_cube_frame(facts).assign(_season_code=facts["_season_code"])
+        by_season = f[f["_season_code"] >= 0].groupby(["_brand", "_season_code"], observed=True).agg(**INOUT_CUBE_AGG).reset_index()
+        by_season = by_season.assign(브랜드=by_season["_brand"].astype(object), 시즌=by_season["_season_code"].map(dict(enumerate(SEASON_OPTIONS))))
+        totals = cube[cube["시즌"].isna()].assign(시즌=HISTORY_ALL_SEASONS)
+        cube = pd.concat([by_season, totals], ignore_index=True)[["브랜드", "시즌"] + HISTORY_TABLES["inout_history"]]
+    return {"monitor_history": pd.concat(monitor_parts, ignore_index=True) if monitor_parts else pd.DataFrame(), "inout_history": cube}
+
+def _history_connect(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    con = sqlite3.connect(path, timeout=30)
+    con.execute("CREATE TABLE IF NOT EXISTS versions (version TEXT PRIMARY KEY, recorded_at TEXT NOT NULL)")
+    for table, cols in HISTORY_TABLES.items():
+        metric_cols = "".join(f', "{c}" NUMERIC' for c in cols)
+        con.execute(f'CREATE TABLE IF NOT EXISTS {table} (version TEXT NOT NULL, recorded_at TEXT NOT NULL, "브랜드" TEXT, "시즌" TEXT{metric_cols})')
+        con.execute(f'CREATE INDEX IF NOT EXISTS {table}_key ON {table} ("브랜드", "시즌", recorded_at)')
+    return con
+
+def record_history(version, sources, recorded_at=None, path=None):
+    """version 의 요약 행을 이력에 추가하고 보존 기간이 지난 행을 지운다. 이미 기록된 버전이면 False.
+    이력 기록 실패는 화면에 영향을 주지 않도록 로그만 남기고 None."""
+    path = path or HISTORY_DB
+    recorded_at = (recorded_at or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        with closing(_history_connect(path)) as con:
+            if con.execute("SELECT 1 FROM versions WHERE version = ?", (version,)).fetchone():
+                return False
+            frames = history_rows(sources)
+            with con:  # 한 트랜잭션: 여러 프로세스가 같은 버전을 기록하려 해도 versions 기본키로 한 번만
+                if con.execute("INSERT OR IGNORE INTO versions VALUES (?, ?)", (version, recorded_at)).rowcount == 0:
+                    return False
+                for table, df in frames.items():
+                    if not df.empty:  # to_sql 은 자체 commit 을 하므로 executemany 로 같은 트랜잭션 안에서
+                        df = df.assign(version=version, recorded_at=recorded_at)
+                        cols = ", ".join(f'"{c}"' for c in df.columns)
+                        con.executemany(f"INSERT INTO {table} ({cols}) VALUES ({', '.join('?' * len(df.columns))})",
+                                        df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+                if HISTORY_RETENTION_DAYS > 0:
+                    cutoff = (datetime.now() - timedelta(days=HISTORY_RETENTION_DAYS)).strftime("%Y-%m-%d %H:%M:%S")
+                    for table in ["versions", *HISTORY_TABLES]:
+                        con.execute(f"DELETE FROM {table} WHERE recorded_at < ?", (cutoff,))
+            return True
+    except Exception:
+        HISTORY_LOGGER.warning("이력 기록 실패 (version=%s)", version, exc_info=True)
+        return None
+
+def load_history(table, brands=(), seasons=(), since=None, daily=True, path=None):
+    """이력 요약 행 (recorded_at 오름차순). daily=True 면 날짜마다 그날 마지막으로 기록된 버전만."""
+    path = path or HISTORY_DB
+    if not os.path.isfile(path):
+        return pd.DataFrame()
+    where, params = [], []
+    if brands:
+        where.append(f'"브랜드" IN ({",".join("?" * len(brands))})')
+        params += list(brands)
+    if seasons:
+        where.append(f'"시즌" IN ({",".join("?" * len(seasons))})')
+        params += list(seasons)
+    if since is not None:
+        where.append("recorded_at >= ?")
+        params.append(pd.Timestamp(since).strftime("%Y-%m-%d %H:%M:%S"))
+    if daily:
+        where.append("recorded_at IN (SELECT MAX(recorded_at) FROM versions GROUP BY substr(recorded_at, 1, 10))")
+    sql = f"SELECT * FROM {table}" + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY recorded_at"
+    try:
+        with closing(_history_connect(path)) as con:
+            return pd.read_sql_query(sql, con, params=params, parse_dates=["recorded_at"])
+    except Exception:
+        return pd.DataFrame()
+
+def history_state(path=None):
+    """(마지막 기록 시각, 기록된 버전 수). 새 버전이 기록될 때만 바뀌므로 추이 캐시 키로 쓴다.
+    데이터 버전과 기록 시점은 다를 수 있다 (첫 버전은 첫 화면 뒤 갱신 스레드가 기록)."""
+    path = path or HISTORY_DB
+    if not os.path.isfile(path):
+        return (None, 0)
+    try:
+        with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)) as con:
+            return tuple(con.execute("SELECT MAX(recorded_at), COUNT(*) FROM versions").fetchone())
+    except Exception:
+        return (None, 0)
+
+@tracked_cache_data(max_entries=32, show_spinner=False)
+def history_trend(state, metric, brands=(), seasons=(), since=None):
+    """추이 차트용 (recorded_at, 브랜드, 시즌, 지표) 표. state = history_state() (기록이 늘 때만 바뀌는 캐시 키)."""
+    table = HISTORY_METRICS[metric]
+    df = load_history(table, brands, seasons, since)
+    if df.empty:
+        return pd.DataFrame(columns=["recorded_at", "브랜드", "시즌", metric])
+    return df[["recorded_at", "브랜드", "시즌", metric]]
+
+# ---- 데이터 버전 / 백그라운드 갱신 ----
+# 세션은 항상 마지막으로 성공한 데이터 버전을 즉시 읽는다. 다시 받기·파싱은 백그라운드 스레드가
+# REFRESH_INTERVAL 마다 수행하고, 캐시를 미리 채운 뒤 새 버전으로 한 번에 교체한다 (stale-while-revalidate).
+class DataVersion:
+    """sources: get_all_sources() 결과, version: 소스 내용 digest, loaded_at: 이 내용을 처음 읽은 시각."""
+    __slots__ = ("sources", "version", "loaded_at")
+
+    def __init__(self, sources, version, loaded_at):
+        self.sources = sources
+        self.version = version
+        self.loaded_at = loaded_at
+
+def _sources_version(sources):
+    """소스별 내용 digest 를 합친 데이터 버전 id. 같은 객체를 공유하는 브랜드 키는 한 번만 계산."""
+    by_id, parts = {}, []
+    for key in sorted(sources):
+        src = sources[key][0]
+        if id(src) not in by_id:
+            by_id[id(src)] = _content_digest(src) if src is not None and len(src) else "-"
+        parts.append(f"{key}={by_id[id(src)]}")
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+def _warm_caches(sources):
+    """세션 첫 화면이 쓰는 캐시(스타일 테이블/드릴다운, 입출고 집계, KPI 팩트, 전체 시즌 소요일·분포)를 미리 계산."""
+    base_bytes = sources.get("inout", (None, None))[0]
+    build_style_table_all(sources)
+    build_style_drilldown(sources)
+    build_inout_aggregates(base_bytes)
+    load_base_facts(base_bytes, _cache_key="base")
+    for brand_name in BRAND_TO_KEY:
+        brand_lead_times(sources, brand_name, tuple(SEASON_OPTIONS))
+    lead_time_distribution(sources, tuple(SEASON_OPTIONS))
+
+def _build_data_version(prev=None):
+    sources = get_all_sources()
+    # 일부 소스를 못 받았으면 직전 버전 유지
+    if prev is not None and any(src is None and prev.sources.get(key, (None, None))[0] is not None for key, (src, _) in sources.items()):
+        return prev
+    version = _sources_version(sources)
+    if prev is not None and prev.version == version:
+        return prev
+    _warm_caches(sources)
+    if prev is not None:  # 첫 로드의 기록은 첫 화면을 막지 않도록 갱신 스레드가 맡는다 (_record_first_version)
+        record_history(version, sources)
+    return DataVersion(sources, version, datetime.now())
+
+def _record_first_version(data_version):
+    record_history(data_version.version, data_version.sources, recorded_at=data_version.loaded_at)
+
+class _NoScriptContextWarning(logging.Filter):
+    """백그라운드 갱신 스레드에서 st 캐시 호출 시 찍히는 'missing ScriptRunContext' 경고 억제."""
+
+    def filter(self, record):
+        return not (threading.current_thread().name == SourceRefresher.THREAD_NAME and "ScriptRunContext" in record.getMessage())
+
+class SourceRefresher:
+    """프로세스 공용 데이터 버전 보관/갱신기. current() 는 대기 없이 마지막 정상 버전을 돌려준다."""
+    THREAD_NAME = "source-refresher"
+
+    def __init__(self, interval, after_first=None):
+        """after_first(데이터 버전): 첫 동기 로드 뒤 갱신 스레드가 시작하면서 한 번 실행할 후속 작업 (첫 화면을 막지 않음)."""
+        self.interval = interval
+        self.after_first = after_first
+        self.last_error = None
+        self.refreshing = False  # 백그라운드에서 새 버전을 만드는 중
+        self.refreshes = 0
+        self.stale_served = 0  # 갱신 중에 이전 버전으로 응답한 횟수
+        self._current = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def current(self, build):
+        # 프로세스 최초 1회만 동기 로드, 이후에는 백그라운드 스레드가 교체
+        if self._current is None:
+            with self._lock:
+                if self._current is None:
+                    self._current = build(None)
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, args=(build,), name=self.THREAD_NAME, daemon=True)
+                self._thread.start()
+            if self.refreshing:
+                self.stale_served += 1
+        return self._current
+
+    def _loop(self, build):
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        logging.getLogger(get_script_run_ctx.__module__).addFilter(_NoScriptContextWarning())
+        after_first, self.after_first = self.after_first, None
+        if after_first is not None:
+            try:
+                after_first(self._current)
+            except Exception as e:
+                self.last_error = repr(e)
+        while True:
+            time.sleep(self.interval)
+            self.refreshing = True
+            try:
+                self._current = build(self._current)
+                self.last_error = None
+            except Exception as e:  # 실패 시 이전 버전을 계속 제공
+                self.last_error = repr(e)
+            finally:
+                self.refreshing = False
+                self.refreshes += 1
+
+@cache_resource
+def _source_refresher():
+    return SourceRefresher(REFRESH_INTERVAL, after_first=_record_first_version)
+
+def get_data_version():
+    return _source_refresher().current(_build_data_version)
+
+# ---- CLI ----
+def sources_from_files(base_path, online_path=None):
+    """로컬 xlsx 파일로 get_all_sources() 와 같은 모양의 소스 dict 구성."""
+    online = SourceHandle(LocalFile.stat(online_path)) if online_path else None
+    return {"inout": (SourceHandle(LocalFile.stat(base_path)), "inout"), **{brand_key: (online, brand_key) for brand_key in BRAND_KEY_TO_SHEET_NAME}}
+
+def write_frame(df, path_stem, fmt):
+    path = f"{path_stem}.{fmt}"
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_json(path, orient="records", force_ascii=False, date_format="iso", indent=1)
+    return path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 xlsx 로 상품등록 모니터링 표와 입출고 큐브 계산")
+    parser.add_argument("--base", required=True, help="입출고 스프레드시트 xlsx")
+    parser.add_argument("--online", help="온라인 등록 스프레드시트 xlsx (브랜드별 워크시트)")
+    parser.add_argument("--out", default="pipeline_out", help="출력 디렉터리")
+    parser.add_argument("--format", choices=["json", "parquet"], default="json")
+    parser.add_argument("--seasons", nargs="*", default=SEASON_OPTIONS, help=f"시즌 필터 (기본: {' '.join(SEASON_OPTIONS)})")
+    parser.add_argument("--history", nargs="?", const=HISTORY_DB, help=f"요약 행을 이력 DB 에 기록 (기본 경로: {HISTORY_DB})")
+    parser.add_argument("--as-of", type=datetime.fromisoformat, help="이력 기록 시각 (지난 파일을 채워 넣을 때, 예: 2026-03-01)")
+    args = parser.parse_args(argv)
+
+    sources = sources_from_files(args.base, args.online)
+    base_bytes = sources["inout"][0]
+    outputs = {
+        "monitor": build_monitor_table(sources, tuple(args.seasons)),
+        "inout_cube": build_inout_cube(base_bytes),
+        "lead_times": build_lead_time_table(sources, tuple(args.seasons)),
+        "style_table": build_style_table_all(sources),
+    }
+    os.makedirs(args.out, exist_ok=True)
+    for name, df in outputs.items():
+        print(f"{write_frame(df, os.path.join(args.out, name), args.format)}  ({len(df)} rows)")
+    if args.history:
+        version = _sources_version(sources)
+        recorded = record_history(version, sources, recorded_at=args.as_of, path=args.history)
+        print(f"{args.history}  (version {version}: {'기록' if recorded else '이미 기록됨' if recorded is False else '기록 실패'})")
+    return 0
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)  # Streamlit 런타임 없이 실행할 때의 경고 생략
+    sys.exit(main())
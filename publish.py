@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""정적 스냅샷 발행: 상품등록 모니터링 표(모든 시즌 조합)와 브랜드·시즌 입출고 표를 정적 HTML/JSON 으로 만든다.
+
+데이터 버전이 바뀔 때만 다시 만들고, 결과 폴더는 아무 정적 서버로 내보내면 된다 (보는 사람마다 Python 실행 없음).
+뷰어(static/index.html, styles.css, app.js)는 manifest.json 을 읽어 시즌 선택에 맞는 표를 불러온다.
+
+    python publish.py --out published              # 한 번 발행
+    python publish.py --out published --watch      # REFRESH_INTERVAL 마다 확인해 새 버전이면 다시 발행
+    python -m http.server 8080 -d published
+
+결과 폴더:
+    manifest.json                   현재 버전, 시즌 조합 → 파일 (마지막에 교체되므로 반쯤 쓴 버전을 가리키지 않음)
+    v/<버전>/monitor/<시즌-조합>.html  모니터링 표 (열 정렬 스크립트 포함) / .json 표 데이터
+    v/<버전>/inout.html, inout.json  입출고 표
+"""
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import itertools
+import pandas as pd
+from datetime import datetime
+
+import pipeline as pl
+from table_html import monitor_rows_html, monitor_table_document, TABLE_COLS, inout_table_html, inout_table_document
+
+STATIC_DIR = os.path.join(pl.BASE_DIR, "static")
+VIEWER_FILES = ("index.html", "styles.css", "app.js")
+PUBLISH_KEEP = 2  # 남겨 둘 버전 폴더 수 (교체 직전에 manifest 를 읽은 뷰어가 이전 버전을 마저 받을 수 있게)
+PUBLISH_LOGGER = logging.getLogger("onlinedash.publish")
+
+def season_combinations(options=pl.SEASON_OPTIONS):
+    """비어 있지 않은 모든 시즌 조합 (SEASON_OPTIONS 순서 유지)."""
+    return [list(c) for n in range(1, len(options) + 1) for c in itertools.combinations(options, n)]
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def _frame_json(df):
+    return df.to_json(orient="records", force_ascii=False, date_format="iso")
+
+def render_snapshot(sources, target):
+    """target 폴더에 표 HTML/JSON 을 쓰고 manifest 용 {시즌 조합 키: 상대 경로}, 입출고 표 경로 반환."""
+    monitor = {}
+    for seasons in season_combinations():
+        key = "-".join(seasons)
+        table_df = pl.build_monitor_table(sources, seasons)
+        _write(os.path.join(target, "monitor", f"{key}.html"), monitor_table_document(monitor_rows_html(table_df)))
+        _write(os.path.join(target, "monitor", f"{key}.json"), _frame_json(table_df))
+        monitor[key] = f"monitor/{key}.html"
+    inout_rows, _, brand_season_df = pl.build_inout_aggregates(sources.get("inout", (None, None))[0])
+    fragment, _ = inout_table_html(pd.DataFrame(inout_rows, columns=["브랜드"] + TABLE_COLS), brand_season_df)
+    _write(os.path.join(target, "inout.html"), inout_table_document(fragment))
+    _write(os.path.join(target, "inout.json"), json.dumps({"brands": inout_rows, "brand_season": json.loads(_frame_json(brand_season_df))}, ensure_ascii=False))
+    return monitor, "inout.html"
+
+def _read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, "manifest.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _prune_versions(out_dir, keep):
+    root = os.path.join(out_dir, "v")
+    dirs = sorted((e for e in os.scandir(root) if e.is_dir() and ".tmp-" not in e.name), key=lambda e: e.stat().st_mtime, reverse=True)
+    for entry in dirs[keep:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+def publish(data_version, out_dir, keep=PUBLISH_KEEP):
+    """data_version 을 out_dir 에 발행. 이미 같은 버전이 발행돼 있으면 False.
+    버전 폴더를 임시 이름으로 다 쓴 뒤 이름을 바꾸고, 마지막에 manifest.json 을 교체한다."""
+    manifest = _read_manifest(out_dir)
+    if manifest and manifest.get("version") == data_version.version and os.path.isdir(os.path.join(out_dir, "v", data_version.version)):
+        return False
+    with pl.perf_timer("publish.render"):
+        final = os.path.join(out_dir, "v", data_version.version)
+        tmp = f"{final}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        monitor, inout = render_snapshot(data_version.sources, tmp)
+        shutil.rmtree(final, ignore_errors=True)
+        os.replace(tmp, final)
+    for name in VIEWER_FILES:
+        shutil.copyfile(os.path.join(STATIC_DIR, name), os.path.join(out_dir, name))
+    manifest = {
+        "version": data_version.version,
+        "loaded_at": data_version.loaded_at.strftime("%Y-%m-%d %H:%M"),
+        "published_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "path": f"v/{data_version.version}/",
+        "seasons": pl.SEASON_OPTIONS,
+        "monitor": monitor,
+        "inout": inout,
+    }
+    _write(os.path.join(out_dir, "manifest.json.tmp"), json.dumps(manifest, ensure_ascii=False, indent=1))
+    os.replace(os.path.join(out_dir, "manifest.json.tmp"), os.path.join(out_dir, "manifest.json"))
+    _prune_versions(out_dir, keep)
+    return True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="모니터링/입출고 표를 정적 HTML/JSON 으로 발행")
+    parser.add_argument("--out", default="published", help="발행 폴더 (정적 서버의 루트)")
+    parser.add_argument("--watch", action="store_true", help="계속 실행하며 데이터 버전이 바뀔 때마다 다시 발행")
+    parser.add_argument("--interval", type=int, default=pl.REFRESH_INTERVAL, help="--watch 확인 주기(초)")
+    parser.add_argument("--keep", type=int, default=PUBLISH_KEEP, help="남겨 둘 버전 폴더 수")
+    args = parser.parse_args(argv)
+
+    while True:
+        # get_data_version(): 첫 호출은 동기 로드, 이후 새 버전 확인·파싱은 백그라운드 갱신 스레드가 수행
+        data_version = pl.get_data_version()
+        try:
+            t0 = time.perf_counter()
+            if publish(data_version, args.out, keep=max(1, args.keep)):
+                print(f"{args.out}  (version {data_version.version}, {time.perf_counter() - t0:.1f}s)", flush=True)
+        except Exception:
+            if not args.watch:
+                raise
+            PUBLISH_LOGGER.exception("발행 실패 (version=%s), 다음 확인 때 다시 시도", data_version.version)
+        if not args.watch:
+            return 0
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)  # Streamlit 런타임 없이 실행할 때의 경고 생략
+    sys.exit(main())
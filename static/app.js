@@ -0,0 +1,56 @@
+// 정적 스냅샷 뷰어: manifest.json 이 가리키는 버전 폴더의 표 HTML 을 불러온다 (publish.py 가 생성).
+// 시즌 선택마다 미리 만들어 둔 모니터링 표를 고르기만 하므로 서버 계산이 없다. 표 안의 열 정렬 스크립트는 그대로 동작.
+(function () {
+  var POLL_MS = 60000;  // 새 버전 확인 주기
+  var manifest = null;
+  var monitorFrame = document.getElementById("monitor-frame");
+  var inoutFrame = document.getElementById("inout-frame");
+  var filter = document.getElementById("season-filter");
+  var status = document.getElementById("status");
+
+  function selectedSeasons() {
+    var boxes = filter.querySelectorAll("input[type=checkbox]");
+    var picked = [];
+    boxes.forEach(function (b) { if (b.checked) picked.push(b.value); });
+    return picked.length ? picked : manifest.seasons;  // 아무것도 고르지 않으면 전체 (대시보드와 동일)
+  }
+
+  function showMonitor() {
+    var key = selectedSeasons().join("-");
+    monitorFrame.src = manifest.path + manifest.monitor[key];
+  }
+
+  function buildFilter() {
+    manifest.seasons.forEach(function (s) {
+      var label = document.createElement("label");
+      var box = document.createElement("input");
+      box.type = "checkbox";
+      box.value = s;
+      box.checked = true;
+      box.addEventListener("change", showMonitor);
+      label.appendChild(box);
+      label.appendChild(document.createTextNode(s));
+      filter.appendChild(label);
+    });
+  }
+
+  function load(next) {
+    var first = manifest === null;
+    manifest = next;
+    if (first) buildFilter();
+    document.getElementById("update-time").textContent = "업데이트시간 " + manifest.loaded_at;
+    status.textContent = "데이터 버전 " + manifest.version + " · 발행 " + manifest.published_at;
+    showMonitor();
+    inoutFrame.src = manifest.path + manifest.inout;
+  }
+
+  function poll() {
+    fetch("manifest.json", { cache: "no-store" })
+      .then(function (r) { return r.json(); })
+      .then(function (next) { if (manifest === null || next.version !== manifest.version) load(next); })
+      .catch(function () { status.textContent = "스냅샷을 불러오지 못했습니다. 잠시 후 다시 시도합니다."; });
+  }
+
+  poll();
+  setInterval(poll, POLL_MS);
+})();
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""상품등록 모니터링 표 / 브랜드·시즌 입출고 표 HTML 생성.
+
+Streamlit 화면(app.py)과 정적 스냅샷 발행(publish.py)이 같은 HTML 을 내도록 화면 스크립트와 분리해 둔다.
+"""
+import html as html_lib
+import pandas as pd
+from pipeline import NO_REG_SHEET_BRANDS, bu_groups
+
+bu_labels = {label for label, _ in bu_groups}
+
+TOOLTIP_RATE = "(초록불) 90% 초과&#10;(노란불) 80% 초과&#10;(빨간불) 80% 이하"
+TOOLTIP_AVG = "(초록불) 3일 이하&#10;(노란불) 5일 이하&#10;(빨간불) 5일 초과"
+rate_tooltip = TOOLTIP_RATE
+avg_tooltip = TOOLTIP_AVG
+
+# ---- 표 HTML: 행마다 f-string 을 만드는 대신 열 단위(Series 문자열 연산)로 셀을 만들어 이어 붙인다 ----
+def escape_cells(s):
+    """html_lib.escape 의 열 단위 버전."""
+    text = s.astype(str)
+    for ch, entity in (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;")):
+        text = text.str.replace(ch, entity, regex=False)
+    return text
+
+def safe_cells(s):
+    """None/NaN/"nan" 은 빈 칸, 나머지는 이스케이프."""
+    text = s.astype(str).where(s.notna(), "")
+    return escape_cells(text.mask(text == "nan", ""))
+
+def fmt_int_cells(s):
+    return s.astype("int64").map("{:,}".format)
+
+def rate_cells(rate_val, rate_text):
+    """등록율 셀: 80% 이하 빨강 / 90% 이하 노랑 / 초과 초록 점 + 표시 문자열."""
+    rate_str = safe_cells(rate_text).mask(rate_text.isna() | rate_text.astype(str).eq(""), "&nbsp;")
+    v = pd.to_numeric(rate_val, errors="coerce")
+    dot_class = pd.Series("rate-green", index=v.index).mask(v <= 0.9, "rate-yellow").mask(v <= 0.8, "rate-red")
+    return rate_str.mask(v.notna(), f"<span class='rate-cell tt-follow' data-tooltip='{TOOLTIP_RATE}'><span class='rate-dot " + dot_class + "'></span>" + rate_str + "</span>")
+
+def avg_days_cells(value_text):
+    """평균 소요일 셀: 3일 이하 초록 / 5일 이하 노랑 / 초과 빨강 점. 숫자가 아니면 점 없이 값만."""
+    raw = value_text.astype(str).str.replace(",", "", regex=False).str.strip()
+    num_val = pd.to_numeric(raw.mask(raw.isin(["", "-", "nan"])), errors="coerce")
+    dot_class = pd.Series("rate-red", index=num_val.index).mask(num_val <= 5, "rate-yellow").mask(num_val <= 3, "rate-green")
+    text = safe_cells(value_text)
+    inner = text.mask(num_val.notna(), "<span class='rate-dot " + dot_class + "'></span>" + text)
+    return f"<span class='avg-cell tt-follow' data-tooltip='{TOOLTIP_AVG}'>" + inner + "</span>"
+
+def _th_sort(label, col_index):
+    inner = label + f"<a class='sort-arrow' href='javascript:void(0)' role='button' data-col='{col_index}' title='정렬'>↕</a>"
+    return f"<th class='th-sort col-small' data-col-index='{col_index}' data-order='desc'>{inner}</th>"
+
+th_rate = '<th class="th-sort col-emphasis" data-col-index="4" data-order="desc"><span class="rate-help tt-follow" data-tooltip="온라인등록 스타일수 / 물류입고 입고스타일수">온라인등록율</span><a class="sort-arrow" href="javascript:void(0)" role="button" data-col="4" title="정렬">↕</a></th>'
+th_avg_total = f'<th class="th-sort col-emphasis"><span class="avg-help tt-follow" data-tooltip="{avg_tooltip}">전체 온라인등록<br>소요일</span></th>'
+th_photo_handover = '<th class="th-sort col-small"><span class="avg-help" data-tooltip="최초입고 ~&#10; 포토팀수령 소요일">포토인계<br>소요일</span></th>'
+th_photo = '<th class="th-sort col-small"><span class="avg-help" data-tooltip="촬영샘플 수령 ~&#10;제품컷완성 소요일">포토 소요일</span></th>'
+th_register = '<th class="th-sort col-small"><span class="avg-help" data-tooltip="제품컷 완성 ~&#10;온라인등록 소요일">상품등록<br>소요일</span></th>'
+
+def monitor_rows_html(monitor_df):
+    if monitor_df.empty:
+        return ""
+    no_reg = monitor_df["브랜드"].isin(NO_REG_SHEET_BRANDS)
+
+    def reg(cells):  # 등록 시트가 없는 브랜드는 등록 관련 칸을 "-" 로
+        return cells.mask(no_reg, "-")
+
+    tr = pd.Series("<tr>", index=monitor_df.index).mask(monitor_df["브랜드"].isin(bu_labels), "<tr class='bu-row'>")
+    return "".join(
+        tr
+        + "<td class='col-small'>" + safe_cells(monitor_df["브랜드"]) + "</td>"
+        + "<td class='col-small'>" + fmt_int_cells(monitor_df["물류입고스타일수"]) + "</td>"
+        + "<td class='col-small'>" + reg(fmt_int_cells(monitor_df["온라인등록스타일수"])) + "</td>"
+        + "<td class='col-emphasis'>" + reg(rate_cells(monitor_df["온라인등록율"], monitor_df["_등록율"])) + "</td>"
+        # 포토인계·포토·상품등록 소요일수 셀은 값만 표시 (초록불 툴팁/색점 없음)
+        + "<td class='col-small'>" + reg(safe_cells(monitor_df["포토인계소요일수"])) + "</td>"
+        + "<td class='col-small'>" + reg(safe_cells(monitor_df["포토 소요일수"])) + "</td>"
+        + "<td class='col-small'>" + reg(safe_cells(monitor_df["상품등록소요일수"])) + "</td>"
+        + "<td class='col-emphasis'>" + reg(avg_days_cells(monitor_df["평균전체등록소요일수"])) + "</td>"
+        + "</tr>"
+    )
+th_online_in = ""
+header_monitor = """
+<tr>
+<th class='col-small'>브랜드</th>
+<th>물류입고<br>스타일수</th>
+<th>온라인등록<br>스타일수</th>
+<th>온라인등록율</th>
+
+<th>포토인계<br>소요일수</th>
+<th>포토<br>소요일수</th>
+<th>상품등록<br>소요일수</th>
+<th>평균전체등록<br>소요일수</th>
+</tr>
+"""
+
+def monitor_table_document(body_monitor):
+    """모니터링 표 전체 HTML 문서 (열 정렬·툴팁 스크립트 포함). components.html 과 정적 파일 모두 이 문서를 쓴다."""
+    return f"""<!DOCTYPE html><html><head><meta charset="utf-8"><style>
+body{{margin:0;background:#0f172a;color:#f1f5f9;font-family:inherit}}
+.monitor-table{{width:100%;border-collapse:collapse;background:#1e293b;color:#f1f5f9}}
+.monitor-table th,.monitor-table td{{border:none;padding:6px 8px;text-align:center;font-size:0.95rem}}
+.monitor-table thead th{{background:#0f172a;color:#f1f5f9;font-weight:700}}
+.monitor-table thead th.col-emphasis{{border:none solid #fbbf24}}
+.monitor-table tr.bu-row td{{background:#d9f7ee;color:#000;font-size:1.15rem;font-weight:700}}
+.monitor-table th.th-sort{{white-space:nowrap;cursor:default}}
+.monitor-table th.th-sort .sort-arrow{{color:#94a3b8;text-decoration:none;margin-left:4px;font-size:0.75rem;cursor:pointer}}
+.monitor-table .rate-cell,.monitor-table .avg-cell{{display:inline-flex;align-items:center;gap:6px;justify-content:center}}
+.monitor-table .rate-dot{{width:16px;height:16px;border-radius:50%;display:inline-block}}
+.monitor-table .rate-red{{background:#ef4444}}.monitor-table .rate-yellow{{background:#f59e0b}}.monitor-table .rate-green{{background:#22c55e}}
+.monitor-table .rate-help,.monitor-table .avg-help{{position:relative;display:inline-block;cursor:help}}
+.monitor-table .rate-help::after,.monitor-table .avg-help::after,.monitor-table .rate-cell::after,.monitor-table .avg-cell::after{{content:"";position:absolute;opacity:0;pointer-events:none;left:50%;transform:translateX(-50%);bottom:calc(100%+6px);white-space:pre-line;width:max-content;max-width:360px;background:#ffffff;color:#1e293b;padding:8px 12px;border-radius:6px;font-size:0.85rem;box-shadow:0 4px 12px rgba(0,0,0,0.2);border:1px solid #e2e8f0;z-index:20}}
+.monitor-table .rate-help:hover::after,.monitor-table .avg-help:hover::after,.monitor-table .rate-cell:hover::after,.monitor-table .avg-cell:hover::after{{content:attr(data-tooltip);opacity:1}}
+.monitor-table thead th:hover{{z-index:10}}
+.monitor-table .avg-help.tt-left::after{{left:0;transform:translateX(0);bottom:calc(100%+6px)}}
+.monitor-table .tt-follow::after{{content:none!important;display:none!important}}
+.monitor-table td.col-emphasis,.monitor-table th.col-emphasis{{font-size:1.045rem;color:#fbbf24}}
+.monitor-table td.col-small,.monitor-table th.col-small{{font-size:0.855rem}}
+.monitor-table .th-sub{{font-size:0.7rem;color:#f1f5f9;font-weight:normal;display:block;margin-top:2px}}
+.monitor-table{{table-layout:fixed}}
+.monitor-table th.col-small,.monitor-table td.col-small{{width:90px;min-width:90px;max-width:90px;box-sizing:border-box}}
+.monitor-table th.col-emphasis,.monitor-table td.col-emphasis{{width:120px;min-width:120px;max-width:120px;box-sizing:border-box}}
+.monitor-table thead th.col-emphasis{{border:none solid #fbbf24}}
+#tooltip-follow{{position:fixed;display:none;white-space:pre-line;width:max-content;max-width:360px;background:#ffffff;color:#1e293b;padding:8px 12px;border-radius:6px;font-size:0.85rem;box-shadow:0 4px 12px rgba(0,0,0,0.2);border:1px solid #e2e8f0;z-index:9999;pointer-events:none}}
+html,body{{height:100%;margin:0;overflow:hidden}}
+.table-wrap{{height:100%;max-height:100%;overflow-y:auto;overflow-x:auto;-webkit-overflow-scrolling:touch}}
+.monitor-table thead th{{position:sticky;top:0;z-index:5;background:#0f172a}}
+</style></head><body><div id="tooltip-follow"></div><div class="table-wrap"><table class="monitor-table" id="monitor-table-register"><thead>{header_monitor}</thead><tbody>{body_monitor}</tbody></table></div>
+<script>(function(){{
+var t=document.getElementById("monitor-table-register");if(!t)return;
+function g(td){{var v=(td&&td.textContent||"").trim().replace(/[,%]/g,"");if(v===""||v==="-")return null;var n=parseFloat(v);return isNaN(n)?v:n}}
+function sort(tbody,ci,ord){{
+var rows=Array.prototype.slice.call(tbody.querySelectorAll("tr"));
+rows.sort(function(a,b){{var va=g(a.cells[ci]),vb=g(b.cells[ci]);if(va===null)va=ord==="desc"?-Infinity:Infinity;if(vb===null)vb=ord==="desc"?-Infinity:Infinity;
+if(typeof va==="number"&&typeof vb==="number")return ord==="desc"?vb-va:va-vb;var sa=String(va),sb=String(vb);if(sa<sb)return ord==="desc"?1:-1;if(sa>sb)return ord==="desc"?-1:1;return 0}});
+rows.forEach(function(r){{tbody.appendChild(r)}});
+}}
+t.addEventListener("click",function(e){{var a=e.target.closest("a.sort-arrow");if(!a)return;e.preventDefault();var th=a.closest("th.th-sort");if(!th)return;
+var ci=parseInt(th.getAttribute("data-col-index"),10),ord=th.getAttribute("data-order")==="desc"?"asc":"desc";th.setAttribute("data-order",ord);
+t.querySelectorAll("thead th.th-sort").forEach(function(h){{var i=h.getAttribute("data-col-index"),x=h.querySelector("a.sort-arrow");if(!x)return;if(i===String(ci)){{h.setAttribute("data-order",ord);x.textContent=ord==="desc"?"▼":"▲"}}else{{h.setAttribute("data-order","desc");x.textContent="↕"}}}});
+var tb=t.querySelector("tbody");if(tb)sort(tb,ci,ord);
+}});
+var tip=document.getElementById("tooltip-follow");var offset=12;
+function showTip(e,text){{if(!text)return;tip.textContent=text.replace(/&#10;/g,"\\n");tip.style.display="block";tip.style.left=(e.clientX+offset)+"px";tip.style.top=(e.clientY+offset)+"px";}}
+function moveTip(e){{tip.style.left=(e.clientX+offset)+"px";tip.style.top=(e.clientY+offset)+"px";}}
+function hideTip(){{tip.style.display="none";}}
+document.querySelectorAll(".tt-follow").forEach(function(el){{var text=el.getAttribute("data-tooltip");if(!text)return;el.addEventListener("mouseenter",function(e){{showTip(e,text);}});el.addEventListener("mousemove",moveTip);el.addEventListener("mouseleave",hideTip);}});
+}})();</script></body></html>"""
+
+# ---- 브랜드별 입출고 표 ----
+TABLE_COLS = ["발주 STY수", "발주액", "입고 STY수", "입고액", "출고 STY수", "출고액", "판매 STY수", "판매액"]
+def _brand_ids(brands):
+    return brands.map(lambda b: f"brand-{abs(hash(b))}")
+
+def _season_rows_html(brand_season_df):
+    """브랜드 → (펼침용 시즌 행 HTML, 행 수). 큐브의 시즌 행 순서((브랜드, 시즌) 정렬)를 그대로 따른다."""
+    if brand_season_df.empty:
+        return {}
+    df = brand_season_df
+    cells = "<td>└ " + escape_cells(df["시즌"].astype(str).str.strip()) + "</td>"
+    for c in TABLE_COLS:
+        v = pd.to_numeric(df[c], errors="coerce")
+        text = (v / 1e8).map("{:,.0f} 억 원".format) if "액" in c else v.round().fillna(0).astype("int64").map("{:,}".format)
+        cells = cells + "<td>" + escape_cells(text.where(v.notna(), "0 억 원" if "액" in c else "0")) + "</td>"
+    rows = "<tr class='season-row " + _brand_ids(df["브랜드"].astype(str)) + "' style='display:none'>" + cells + "</tr>"
+    grouped = rows.groupby(df["브랜드"].astype(str), sort=False)
+    return {brand: ("".join(part), len(part)) for brand, part in grouped}
+
+def inout_table_html(display_df, brand_season_df):
+    cols = ["브랜드"] + TABLE_COLS
+    header_cells = "".join(f"<th>{html_lib.escape(str(c))}</th>" for c in cols)
+    brand_names = display_df["브랜드"].astype(str).str.strip()
+    brand_ids = _brand_ids(brand_names)
+    brand_rows = ("<tr class='brand-row'><td class='brand-cell'><button type='button' class='brand-toggle' data-target='" + brand_ids
+                  + "' aria-expanded='false'><span class='label'>" + escape_cells(brand_names) + "</span><span class='caret'>▽</span></button></td>")
+    for c in TABLE_COLS:
+        brand_rows = brand_rows + "<td>" + escape_cells(display_df[c]) + "</td>"
+    brand_rows = brand_rows + "</tr>"
+    season_rows = _season_rows_html(brand_season_df)
+    body_rows = "".join(row + season_rows.get(brand, ("", 0))[0] for brand, row in zip(brand_names, brand_rows))
+    row_count = len(display_df) + sum(season_rows.get(brand, ("", 0))[1] for brand in brand_names)
+    html = f"""<style>.brand-expand-table{{width:100%;border:1px solid #334155;border-radius:8px;overflow:hidden;background:#1e293b;color:#f1f5f9;margin-top:0.5rem}}.brand-expand-table table{{width:100%;border-collapse:collapse}}.brand-expand-table th,.brand-expand-table td{{border:1px solid #334155;padding:6px 8px;text-align:center;font-size:0.95rem}}.brand-expand-table thead th{{background:#0f172a;color:#f1f5f9;font-weight:700}}.brand-expand-table .brand-row{{background:#111827}}.brand-expand-table .brand-cell{{text-align:left}}.brand-expand-table .brand-toggle{{all:unset;cursor:pointer;display:inline-flex;align-items:center;gap:6px;font-weight:700;color:#f1f5f9}}.brand-expand-table .brand-toggle .caret{{display:inline-block;transition:transform 0.15s;color:#94a3b8;font-size:0.9rem}}.brand-expand-table .brand-toggle[aria-expanded="true"] .caret{{transform:rotate(90deg)}}.brand-expand-table .season-row{{display:none}}.brand-expand-table .season-row td{{background:#0f172a;font-size:0.9rem;color:#cbd5e1}}.brand-expand-table .season-row td:first-child{{text-align:left;padding-left:18px}}</style><div class="brand-expand-table"><table><thead><tr>{header_cells}</tr></thead><tbody>{body_rows}</tbody></table></div><script>document.addEventListener("click",function(e){{var btn=e.target.closest(".brand-toggle");if(!btn)return;var target=btn.dataset.target;var rows=document.querySelectorAll("tr."+target);var caret=btn.querySelector(".caret");var isOpen=btn.getAttribute("aria-expanded")==="true";rows.forEach(function(row){{row.style.display=isOpen?"none":"table-row"}});btn.setAttribute("aria-expanded",String(!isOpen));caret.textContent=isOpen?"▽":"△";}});</script>"""
+    return html, row_count
+
+def inout_table_document(fragment):
+    """입출고 표 조각(inout_table_html)을 단독 HTML 문서로 (정적 파일용)."""
+    return f'<!DOCTYPE html><html><head><meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1"></head><body style="margin:0;background:#0f172a;font-family:sans-serif">{fragment}</body></html>'
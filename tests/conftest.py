@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+from io import BytesIO
+from datetime import datetime
+
+import pytest
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pipeline as pl
+from fake_sources import FakeSheetsBackend
+
+REGISTER_HEADER = ["스타일코드", "시즌", "공홈등록일", "포토인계일", "리터칭완료일"]
+BASE_HEADER = ["스타일코드", "시즌", "최초입고일", "입고량", "출고액", "누적판매액"]
+
+
+def xlsx_bytes(sheets):
+    """{워크시트: 행 리스트} → xlsx 바이트."""
+    wb = Workbook()
+    wb.remove(wb.active)
+    for title, rows in sheets.items():
+        ws = wb.create_sheet(title)
+        for row in rows:
+            ws.append(row)
+    fh = BytesIO()
+    wb.save(fh)
+    return fh.getvalue()
+
+
+def online_workbook(registered_at=datetime(2026, 1, 20)):
+    rows = [REGISTER_HEADER,
+            ["SPA1", "1", registered_at, datetime(2026, 1, 12), datetime(2026, 1, 15)],
+            ["SPA2", "1", None, datetime(2026, 1, 13), None]]
+    return xlsx_bytes({"스파오": rows, "후아유": [REGISTER_HEADER, ["WHA1", "2", None, None, None]]})
+
+
+def base_workbook():
+    return xlsx_bytes({"입출고": [BASE_HEADER,
+                                   ["SPA1", "1", datetime(2026, 1, 10), 10, 1000, 500],
+                                   ["SPA2", "1", datetime(2026, 1, 11), 5, 0, 0],
+                                   ["WHA1", "2", datetime(2026, 1, 9), 3, 300, 100]]})
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    """테스트마다 빈 스냅샷 폴더·이력 파일과 빈 계산 캐시."""
+    monkeypatch.setattr(pl, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(pl, "HISTORY_DB", str(tmp_path / "history.sqlite"))
+    pl.clear_caches()
+    yield
+    pl.clear_caches()
+
+
+@pytest.fixture
+def fake_backend():
+    backend = FakeSheetsBackend({"inout": base_workbook(), "online": online_workbook()})
+    prev = pl.set_source_backend(backend)
+    yield backend
+    pl.set_source_backend(prev)
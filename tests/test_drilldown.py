@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+import pipeline as pl
+from conftest import xlsx_bytes, online_workbook, BASE_HEADER
+
+
+def drilldown_sources():
+    base = xlsx_bytes({"입출고": [BASE_HEADER,
+                                   ["SPA1", "1", datetime(2026, 1, 10), 10, 1000, 500],
+                                   ["SPA2", "1", datetime(2026, 1, 11), 5, 0, 0],
+                                   ["SPA3", "2", datetime(2026, 1, 5), 5, 0, 0],
+                                   ["SPA4", "1", None, 0, 0, 0],
+                                   ["WHA1", "2", datetime(2026, 1, 9), 3, 300, 100],
+                                   ["MIX1", "1", datetime(2026, 1, 8), 3, 300, 100]]})
+    online = pl.SourceHandle(online_workbook())
+    return {"inout": (pl.SourceHandle(base), "inout"), **{key: (online, key) for key in pl.BRAND_KEY_TO_SHEET_NAME}}
+
+
+def styles(sources, **kwargs):
+    df = pl.build_style_drilldown(sources)
+    return df["스타일코드"].iloc[pl.style_drilldown_order("v1", _sources=sources, **kwargs)].tolist()
+
+
+def test_drilldown_filters():
+    sources = drilldown_sources()
+    assert sorted(styles(sources, brands=("스파오",))) == ["SPA1", "SPA2", "SPA3", "SPA4"]
+    assert sorted(styles(sources, season_codes=(1,))) == ["SPA3", "WHA1"]
+    assert sorted(styles(sources, statuses=("미등록",))) == ["MIX1", "SPA2", "SPA3", "WHA1"]
+    assert styles(sources, statuses=("미입고",)) == ["SPA4"]
+    assert sorted(styles(sources, search=" spa ")) == ["SPA1", "SPA2", "SPA3", "SPA4"]
+    assert styles(sources, brands=("스파오",), season_codes=(0,), statuses=("등록",), search="1") == ["SPA1"]
+
+
+def test_drilldown_sort_puts_missing_dates_last():
+    sources = drilldown_sources()
+    assert styles(sources, brands=("스파오",), sort_by="최초입고일", descending=True) == ["SPA2", "SPA1", "SPA3", "SPA4"]
+    assert styles(sources, brands=("스파오",), sort_by="최초입고일") == ["SPA3", "SPA1", "SPA2", "SPA4"]
+
+
+def test_drilldown_last_page_is_partial():
+    sources = drilldown_sources()
+    df = pl.build_style_drilldown(sources)
+    positions = pl.style_drilldown_order("v1", sort_by="스타일코드", _sources=sources)
+    assert len(positions) == 6
+    page = pl.style_drilldown_page(df, positions, 1, 4)
+    assert page["스타일코드"].tolist() == ["SPA4", "WHA1"]
+    assert "_season_code" not in page.columns
+    assert pl.style_drilldown_page(df, positions, 2, 4).empty
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import threading
+from datetime import datetime
+
+import pipeline as pl
+from conftest import xlsx_bytes, online_workbook
+
+
+def sources_with_seasons(seasons):
+    rows = [["스타일코드", "시즌", "최초입고일", "출고액", "누적판매액"]]
+    rows += [[f"SPA{i}", season, datetime(2026, 1, 10), 100, 100] for i, season in enumerate(seasons)]
+    base, online = pl.SourceHandle(xlsx_bytes({"입출고": rows})), pl.SourceHandle(online_workbook())
+    return {"inout": (base, "inout"), **{key: (online, key) for key in pl.BRAND_KEY_TO_SHEET_NAME}}
+
+
+def test_inout_history_seasons_match_the_season_filter():
+    sources = sources_with_seasons(["1", "G1", "1 ", "2시즌", "X"])
+    assert pl.record_history("v1", sources)
+    df = pl.load_history("inout_history", brands=("스파오",), daily=False).set_index("시즌")
+    # 시즌 필터(_season_code)와 같은 기준: "1", "1 " → "1". "G1", "2시즌", "X" 는 필터가 고르지 못하므로 합계에만
+    assert df.at["1", "입고 STY수"] == 2
+    assert "2" not in df.index
+    assert df.at[pl.HISTORY_ALL_SEASONS, "입고 STY수"] == 5
+    assert set(df.index) <= {pl.HISTORY_ALL_SEASONS, *pl.SEASON_OPTIONS}
+    assert pl.history_trend(pl.history_state(), "입고 STY수", ("스파오",), ("1",))["입고 STY수"].tolist() == [2]
+
+
+def test_first_version_is_recorded_after_first_load(fake_backend):
+    recorded = threading.Event()
+    refresher = pl.SourceRefresher(3600, after_first=lambda dv: (pl._record_first_version(dv), recorded.set()))
+    data_version = refresher.current(pl._build_data_version)
+    assert recorded.wait(30)
+    assert pl.load_history("versions", daily=False)["version"].tolist() == [data_version.version]
+
+
+def test_trend_read_before_first_record_is_not_stale(fake_backend):
+    data_version = pl._build_data_version(None)  # 첫 버전: 기록은 첫 화면 뒤 갱신 스레드가
+    assert pl.history_trend(pl.history_state(), "입고 STY수", ("스파오",), (pl.HISTORY_ALL_SEASONS,)).empty
+    pl._record_first_version(data_version)
+    trend = pl.history_trend(pl.history_state(), "입고 STY수", ("스파오",), (pl.HISTORY_ALL_SEASONS,))
+    assert trend["입고 STY수"].tolist() == [2]
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+import pipeline as pl
+from conftest import xlsx_bytes
+
+
+def test_inout_table_and_kpi_keep_their_sale_columns():
+    base = pl.SourceHandle(xlsx_bytes({"입출고": [
+        ["스타일코드", "시즌", "최초입고일", "출고액", "누적판매액", "누적 판매액[외형매출]"],
+        ["SPA1", "1", datetime(2026, 1, 10), 100, 200_000_000, 300_000_000],
+        ["SPA2", "1", datetime(2026, 1, 11), 0, 0, 100_000_000],
+    ]}))
+    facts = pl.load_base_facts(base)
+    assert facts["_sale_amt"].sum() == 400_000_000  # KPI: 외형매출
+    assert int(facts["_sale"].sum()) == 2
+
+    rows, agg, brand_season_df = pl.build_inout_aggregates(base)
+    spao = next(row for row in rows if row["브랜드"] == "스파오")
+    assert spao["판매액"] == "2 억 원" and spao["판매 STY수"] == "1"  # 입출고 표: 누적판매액
+    assert agg["brand_sale_qty"] == {"스파오": 1}
+    assert brand_season_df.loc[brand_season_df["시즌"] == "1", "판매액"].tolist() == [200_000_000]
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+
+import pytest
+
+import pipeline as pl
+from conftest import xlsx_bytes, REGISTER_HEADER, BASE_HEADER
+
+STAGE = "평균전체등록소요일수"  # 최초입고일 → 공홈등록일
+
+
+def test_lead_time_distribution_negative_row_and_bucket_edges():
+    first_in = datetime(2026, 1, 10)
+    days = {"SPA1": -2, "SPA2": 0, "SPA3": 1, "SPA4": 3, "SPA5": 90}
+    base = xlsx_bytes({"입출고": [BASE_HEADER] + [[style, "1", first_in, 1, 0, 0] for style in days]})
+    online = xlsx_bytes({"스파오": [REGISTER_HEADER] + [[style, "1", first_in + timedelta(days=d), None, None] for style, d in days.items()]})
+    sources = {"inout": (pl.SourceHandle(base), "inout"), "spao": (pl.SourceHandle(online), "spao")}
+    summary, hist = pl.lead_time_distribution(sources)
+
+    row = summary.set_index(["브랜드", "단계"]).loc[("스파오", STAGE)]
+    assert (row["건수"], row["음수"], row["최대"]) == (5, 1, 90)
+    # 음수는 0 으로 잘라 평균·백분위에 포함: [0, 0, 1, 3, 90]
+    assert row["평균"] == pytest.approx(18.8)
+    assert (row["p10"], row["p50"], row["p75"]) == (0, 1, 3)
+    assert row["p90"] == pytest.approx(55.2)
+
+    counts = hist[(hist["브랜드"] == "스파오") & (hist["단계"] == STAGE)].set_index("구간")["건수"]
+    assert counts.index.tolist() == [pl.LEAD_TIME_NEGATIVE_BUCKET] + pl.LEAD_TIME_BUCKET_LABELS
+    assert counts.to_dict() == {pl.LEAD_TIME_NEGATIVE_BUCKET: 1, "0": 1, "1-2": 1, "3-4": 1, "90+": 1,
+                                **{label: 0 for label in ["5-6", "7-13", "14-20", "21-29", "30-59", "60-89"]}}
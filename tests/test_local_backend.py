@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+
+import pipeline as pl
+from conftest import base_workbook
+
+
+def write(path, data, age):
+    with open(path, "wb") as f:
+        f.write(data)
+    then = time.time() - age
+    os.utime(path, (then, then))
+
+
+def test_new_file_waits_until_settled(tmp_path):
+    settled = pl.LOCAL_SETTLE_SECONDS + 60
+    write(tmp_path / "DB_입출고_0101.xlsx", base_workbook(), age=settled + 10)
+    backend = pl.LocalFolderBackend(str(tmp_path))
+    first = backend.sources()["inout"][0]
+    assert first.data.path.endswith("DB_입출고_0101.xlsx")
+
+    write(tmp_path / "DB_입출고_0102.xlsx", b"", age=settled)  # 빈 파일
+    write(tmp_path / "DB_입출고_0103.xlsx", base_workbook()[:100], age=0)  # 아직 쓰는 중
+    assert backend.sources()["inout"][0] is first
+
+    write(tmp_path / "DB_입출고_0103.xlsx", base_workbook(), age=1)  # 다 썼지만 아직 settle 시간 안
+    assert backend.sources()["inout"][0] is first
+    then = time.time() - settled + 30
+    os.utime(tmp_path / "DB_입출고_0103.xlsx", (then, then))
+    picked = backend.sources()["inout"][0]
+    assert picked.data.path.endswith("DB_입출고_0103.xlsx")
+    assert not pl.load_base_inout(picked).empty
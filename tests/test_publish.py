@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+
+import pipeline as pl
+import publish
+from conftest import online_workbook
+
+
+def test_source_change_is_republished(fake_backend, tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(pl.time, "monotonic", lambda: clock[0])
+    out = str(tmp_path / "published")
+
+    v1 = pl._build_data_version(None)
+    assert publish.publish(v1, out)
+    assert not publish.publish(v1, out)
+
+    fake_backend.set_fixture("online", online_workbook(registered_at=None))
+    assert pl._build_data_version(v1) is v1  # SOURCE_CHECK_TTL 안에서는 버전 확인 캐시를 쓴다
+    clock[0] += pl.SOURCE_CHECK_TTL + 1
+    v2 = pl._build_data_version(v1)
+    assert v2.version != v1.version
+    assert publish.publish(v2, out)
+
+    with open(os.path.join(out, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest["version"] == v2.version
+    with open(os.path.join(out, manifest["path"], "monitor", "1.json"), encoding="utf-8") as f:
+        spao = next(row for row in json.load(f) if row["브랜드"] == "스파오")
+    assert spao["온라인등록스타일수"] == 0
+
+
+def test_local_cache_evicts_least_recently_used():
+    calls = []
+
+    @pl._local_cache(max_entries=2)
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    for x in (1, 2, 1, 3, 1, 2):
+        square(x)
+    assert calls == [1, 2, 3, 2]
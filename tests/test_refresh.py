@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import pytest
+
+import pipeline as pl
+
+CALLERS = 8
+
+
+def call_concurrently(fn):
+    """CALLERS 개 스레드가 동시에 fn() 호출 → 스레드별 결과 또는 예외."""
+    start, results = threading.Barrier(CALLERS), [None] * CALLERS
+
+    def worker(i):
+        start.wait()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(CALLERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(30)
+    return results
+
+
+def test_concurrent_fetches_share_one_export(fake_backend):
+    fake_backend.latency["export"] = 0.3
+    before = pl.refresh_coordinator().snapshot().get("fetch", {"runs": 0, "joined": 0})
+    results = call_concurrently(lambda: pl.fetch_sheet_bytes("inout", "1"))
+    assert fake_backend.stats()["calls"]["export"] == 1
+    assert len({id(r) for r in results}) == 1 and isinstance(results[0], pl.SourceHandle)
+    after = pl.refresh_coordinator().snapshot()["fetch"]
+    assert after["runs"] - before["runs"] == 1
+    assert after["joined"] - before["joined"] == CALLERS - 1
+
+
+def test_joiners_receive_the_leaders_error(fake_backend):
+    fake_backend.latency["export"] = 0.3
+    for op in ("export", "titles"):
+        fake_backend.fail(op)
+    results = call_concurrently(lambda: pl.fetch_sheet_bytes("inout", "1"))
+    assert fake_backend.stats()["calls"]["export"] == 1
+    assert isinstance(results[0], pl.SourceUnavailable)
+    assert all(r is results[0] for r in results)
+
+
+def test_reentrant_call_runs_inline():
+    coordinator, result = pl.RefreshCoordinator(), []
+    worker = threading.Thread(target=lambda: result.append(coordinator.run("compute", "k", lambda: coordinator.run("compute", "k", lambda: 42))), daemon=True)
+    worker.start()
+    worker.join(5)
+    assert not worker.is_alive(), "같은 스레드의 재진입 호출이 자기 자신을 기다림"
+    assert result == [42]
+    assert coordinator.snapshot()["compute"] == {"runs": 1, "joined": 0, "errors": 0, "wait_seconds": 0.0, "in_flight": 0}
+
+
+def test_leader_error_is_not_cached():
+    coordinator = pl.RefreshCoordinator()
+    with pytest.raises(ValueError):
+        coordinator.run("compute", "k", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert coordinator.run("compute", "k", lambda: 1) == 1
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pipeline as pl
+
+
+def test_values_fallback_source_reaches_register_loader(fake_backend):
+    fake_backend.fail("export")
+    src = pl.fetch_sheet_bytes("online", "v1")
+    assert fake_backend.stats()["calls"]["values"] > 0
+    assert isinstance(src, pl.SourceHandle) and isinstance(src.data, dict)
+
+    frame = pl.load_brand_register_frame(src, _cache_key="spao", target_sheet_name="스파오")
+    assert list(frame["스타일코드"]) == ["SPA1", "SPA2"]
+    assert frame["등록여부"].tolist() == [True, False]
+
+
+def test_values_fallback_matches_export(fake_backend):
+    exported = pl.load_brand_register_frame(pl.fetch_sheet_bytes("online", "v1"), _cache_key="spao", target_sheet_name="스파오")
+    fake_backend.fail("export")
+    fallback = pl.load_brand_register_frame(pl.fetch_sheet_bytes("online", "v2"), _cache_key="spao", target_sheet_name="스파오")
+    assert fallback[["스타일코드", "등록여부", "공홈등록일"]].equals(exported[["스타일코드", "등록여부", "공홈등록일"]])
+
+
+def test_failed_parse_is_not_snapshotted(fake_backend, monkeypatch):
+    src = pl.fetch_sheet_bytes("online", "v1")
+    with monkeypatch.context() as m:
+        m.setattr(pl, "load_online_workbook", lambda io_bytes=None: {})  # 일시적 읽기 실패
+        assert pl.load_brand_register_frame(src, _cache_key="spao", target_sheet_name="스파오").empty
+    assert not os.path.isdir(pl.SNAPSHOT_DIR) or not os.listdir(pl.SNAPSHOT_DIR)
+
+    pl.clear_caches()  # 재시작
+    assert len(pl.load_brand_register_frame(src, _cache_key="spao", target_sheet_name="스파오")) == 2
+    assert os.listdir(pl.SNAPSHOT_DIR)